@@ -0,0 +1,88 @@
+/**
+ * 头像缩略图与雪碧图
+ * avatars/sprites/sprites.json 由 scripts/fetch_members/avatar_thumbs.py 生成，
+ * 记录每个尺寸的缩略图、雪碧图和偏移量；索引缺失或用户不在索引中时回退到原始头像
+ */
+import { ref } from 'vue'
+
+const SPRITE_INDEX_PATH = 'avatars/sprites/sprites.json'
+
+// 所有组件共享同一份索引，只请求一次
+const spriteIndex = ref(null)
+let indexPromise = null
+
+function withBasePath(path) {
+  const basePath = import.meta.env.BASE_URL || '/'
+  return `${basePath}${path}`.replace(/\/+/g, '/')
+}
+
+/**
+ * 加载 sprites.json（在 onMounted 中与成员数据并行调用）
+ * 加载失败时返回 null，组件继续使用原始头像
+ */
+export function loadAvatarIndex() {
+  if (!indexPromise) {
+    indexPromise = fetch(withBasePath(SPRITE_INDEX_PATH))
+      .then(res => (res.ok ? res.json() : null))
+      .catch(() => null)
+      .then(data => {
+        spriteIndex.value = data
+        return data
+      })
+  }
+  return indexPromise
+}
+
+/**
+ * 从 avatars/{username}.jpg 中取出索引使用的用户名
+ */
+function avatarKey(avatar) {
+  const match = /^avatars\/([^/]+)\.jpg$/.exec(avatar || '')
+  return match ? match[1] : null
+}
+
+/**
+ * 选择能覆盖显示尺寸（按设备像素比放大）的最小缩略图尺寸
+ */
+function pickSize(sizes, displaySize) {
+  const ratio = typeof window !== 'undefined' ? (window.devicePixelRatio || 1) : 1
+  const target = displaySize * ratio
+  return sizes.find(size => size >= target) || sizes[sizes.length - 1]
+}
+
+/**
+ * 缩略图地址，没有对应缩略图时返回 null
+ * @param {string} avatar - members.json 中的头像路径
+ * @param {number} displaySize - 显示尺寸（CSS 像素）
+ */
+export function avatarThumbUrl(avatar, displaySize) {
+  const index = spriteIndex.value
+  const key = avatarKey(avatar)
+  if (!index || !key || !(key in (index.slots || {}))) return null
+
+  const size = pickSize(index.sizes, displaySize)
+  return withBasePath(`avatars/thumbs/${size}/${key}.${index.format}`)
+}
+
+/**
+ * 雪碧图背景样式，适合一次显示大量小头像的列表；没有对应槽位时返回 null
+ * @param {string} avatar - members.json 中的头像路径
+ * @param {number} displaySize - 显示尺寸（CSS 像素）
+ */
+export function avatarSpriteStyle(avatar, displaySize) {
+  const index = spriteIndex.value
+  const key = avatarKey(avatar)
+  if (!index || !key) return null
+
+  const size = pickSize(index.sizes, displaySize)
+  const offset = index.offsets?.[String(size)]?.[key]
+  if (!offset) return null
+
+  // 按显示尺寸缩放整张雪碧图，再定位到该用户的槽位
+  const scale = displaySize / size
+  return {
+    backgroundImage: `url(${withBasePath(offset.sheet)})`,
+    backgroundSize: `${index.columns * displaySize}px ${index.rows * displaySize}px`,
+    backgroundPosition: `-${offset.x * scale}px -${offset.y * scale}px`
+  }
+}
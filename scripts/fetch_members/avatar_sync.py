@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+头像同步
+- 并发下载成员头像；已有头像用 ETag / Last-Modified 发条件请求，未变化时服务器返回 304
+- manifest.json 记录 用户名 → 来源 URL、ETag、Last-Modified、内容哈希，随头像一起提交，
+  内容哈希不变时不重写文件，避免产生无意义的 git 变更
+- 来源 URL 去掉查询参数后再记录和比较：GraphQL 的 avatarUrl 和 REST 的 avatar_url
+  指向同一头像但参数不同（u=、v=、s=），不去掉时换一种接口就会重新下载所有头像
+- 删除已不在成员列表中的用户的头像
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
+
+MANIFEST_FILENAME = 'manifest.json'
+
+
+def content_hash(content):
+    return hashlib.sha256(content).hexdigest()
+
+
+def normalize_avatar_url(url):
+    """去掉头像 URL 的查询参数（尺寸、版本等），同一用户的头像得到同一个来源"""
+    if not url:
+        return url
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, '', ''))
+
+
+class AvatarSync:
+    """头像目录及其 manifest（线程安全）"""
+
+    def __init__(self, client, avatars_dir, timeout=30):
+        self.client = client
+        self.avatars_dir = Path(avatars_dir)
+        self.manifest_file = self.avatars_dir / MANIFEST_FILENAME
+        self.timeout = timeout
+        self.manifest = self._load_manifest()
+        self.stats = {'downloaded': 0, 'updated': 0, 'not_modified': 0, 'unchanged': 0, 'failed': 0}
+        self._synced = {}  # 本次运行已同步的用户名 -> 本地路径
+        self._lock = threading.Lock()
+
+    def _load_manifest(self):
+        if not self.manifest_file.exists():
+            return {}
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  读取头像 manifest 失败，将重新校验所有头像: {e}")
+            return {}
+
+    @staticmethod
+    def relative_path(username):
+        return f"avatars/{username}.jpg"
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def sync_one(self, username, avatar_url):
+        """
+        同步一个用户的头像，同一次运行中每个用户只同步一次
+
+        Returns:
+            本地头像的相对路径（avatars/{username}.jpg），没有可用头像时返回 None
+        """
+        if not username or not avatar_url:
+            return None
+        with self._lock:
+            if username in self._synced:
+                return self._synced[username]
+
+        path = self.avatars_dir / f"{username}.jpg"
+        entry = self.manifest.get(username)
+        # 来源 URL 没变时发条件请求；新用户、manifest 之前的旧头像和换了 URL 的用户直接下载
+        source = normalize_avatar_url(avatar_url)
+        conditional = (path.exists() and entry is not None
+                       and normalize_avatar_url(entry.get('source')) == source)
+        response = self.client.download_if_changed(
+            avatar_url,
+            etag=entry.get('etag') if conditional else None,
+            last_modified=entry.get('last_modified') if conditional else None,
+            timeout=self.timeout,
+        )
+
+        if response is None:
+            self._count('failed')
+            result = self.relative_path(username) if path.exists() else None
+        elif response.status_code == 304:
+            self._count('not_modified')
+            result = self.relative_path(username)
+        else:
+            result = self._store(username, avatar_url, path, response)
+
+        with self._lock:
+            self._synced[username] = result
+        return result
+
+    def _store(self, username, avatar_url, path, response):
+        """保存下载的头像，内容哈希与现有文件相同时只更新 manifest"""
+        content = response.data or b''
+        if not content:
+            self._count('failed')
+            return self.relative_path(username) if path.exists() else None
+
+        digest = content_hash(content)
+        existed = path.exists()
+        if existed and content_hash(path.read_bytes()) == digest:
+            self._count('unchanged')
+        else:
+            self.avatars_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(content)
+            os.replace(tmp_path, path)
+            if existed:
+                self._count('updated')
+                print(f"  🔄 头像已更新: {username}")
+            else:
+                self._count('downloaded')
+                print(f"  📸 下载头像: {username}")
+
+        with self._lock:
+            self.manifest[username] = {
+                'source': normalize_avatar_url(avatar_url),
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'sha256': digest,
+            }
+        return self.relative_path(username)
+
+    def sync(self, avatar_urls):
+        """
+        并发同步多个用户的头像
+
+        Args:
+            avatar_urls: {username: avatar_url}
+
+        Returns:
+            {username: 本地头像相对路径或 None}
+        """
+        items = list(avatar_urls.items())
+        results = self.client.map(lambda item: self.sync_one(*item), items)
+        return {username: result for (username, _), result in zip(items, results)}
+
+    def prune(self, usernames):
+        """
+        删除不在 usernames 中的用户的头像和 manifest 记录
+
+        Returns:
+            删除的文件数
+        """
+        keep = set(usernames)
+        removed = 0
+        if self.avatars_dir.exists():
+            for path in self.avatars_dir.glob('*.jpg'):
+                if path.stem not in keep:
+                    path.unlink()
+                    removed += 1
+        with self._lock:
+            for username in [username for username in self.manifest if username not in keep]:
+                del self.manifest[username]
+        return removed
+
+    def save(self):
+        """写入 manifest（按用户名排序，内容不变时文件也不变）"""
+        self.avatars_dir.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            manifest = dict(sorted(self.manifest.items()))
+        tmp_path = self.manifest_file.with_name(f"{MANIFEST_FILENAME}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.manifest_file)
+
+    def report(self):
+        """打印本次同步的统计"""
+        s = self.stats
+        print(f"  - 头像同步: 新增 {s['downloaded']}，更新 {s['updated']}，未变化 {s['not_modified'] + s['unchanged']}"
+              f"（304 {s['not_modified']}），失败 {s['failed']}")
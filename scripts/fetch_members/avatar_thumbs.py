@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+头像缩略图与雪碧图
+- 把 avatars/{username}.jpg 裁成正方形，按几个固定尺寸生成 WebP 缩略图：avatars/thumbs/{size}/{username}.webp
+- 每个尺寸再把缩略图拼成若干张雪碧图 avatars/sprites/{size}-{n}.webp，
+  偏移量写入 avatars/sprites/sprites.json，前端可以用一张图显示一批头像
+- 前端通过 docs/.vitepress/theme/utils/avatarThumbs.js 使用：成员卡片和排行榜使用缩略图，
+  徽章墙的成员列表使用雪碧图；索引中没有的用户回退到原始头像
+- sprites.json 同时记录每个用户的槽位和源头像的内容哈希：
+  只重新生成内容哈希变化的头像，只重拼包含变化槽位的雪碧图；
+  已有用户的槽位保持不变，删除用户空出的槽位留给新用户，避免整张图随成员变化而重排
+- 依赖 Pillow；没有安装时跳过，不影响成员数据的生成
+"""
+
+import json
+import os
+from pathlib import Path
+
+try:
+    from PIL import Image
+except ImportError:
+    # Pillow 不是必需的，没有安装时不生成缩略图
+    Image = None
+
+from avatar_sync import MANIFEST_FILENAME, content_hash
+
+THUMB_SIZES = (32, 64, 128)
+THUMB_FORMAT = 'webp'
+THUMB_QUALITY = 80
+SPRITE_COLUMNS = 16  # 每张雪碧图的列数
+SPRITE_ROWS = 16  # 每张雪碧图的行数
+SPRITE_INDEX_FILENAME = 'sprites.json'
+
+
+def _write_atomic(image, path, **options):
+    """先写临时文件再替换，中断时不留下半张图"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp{path.suffix}")
+    image.save(tmp_path, format=THUMB_FORMAT.upper(), **options)
+    os.replace(tmp_path, path)
+
+
+def _square(image):
+    """居中裁成正方形"""
+    width, height = image.size
+    side = min(width, height)
+    left = (width - side) // 2
+    top = (height - side) // 2
+    return image.crop((left, top, left + side, top + side))
+
+
+class AvatarThumbnails:
+    """按内容哈希增量生成缩略图和雪碧图"""
+
+    def __init__(self, avatars_dir, sizes=THUMB_SIZES, columns=SPRITE_COLUMNS, rows=SPRITE_ROWS):
+        self.avatars_dir = Path(avatars_dir)
+        self.thumbs_dir = self.avatars_dir / 'thumbs'
+        self.sprites_dir = self.avatars_dir / 'sprites'
+        self.index_file = self.sprites_dir / SPRITE_INDEX_FILENAME
+        self.sizes = tuple(sorted(int(size) for size in sizes))
+        self.columns = columns
+        self.rows = rows
+        self.capacity = columns * rows
+        self.stats = {'generated': 0, 'removed': 0, 'failed': 0, 'sheets': 0}
+
+    def _load_index(self):
+        """读取上次的槽位和哈希，尺寸或布局变化时整体重建"""
+        if not self.index_file.exists():
+            return {}
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  读取雪碧图索引失败，将重新生成所有缩略图: {e}")
+            return {}
+        if (index.get('sizes') != list(self.sizes) or index.get('columns') != self.columns
+                or index.get('rows') != self.rows):
+            print("⚠️  缩略图尺寸或雪碧图布局已变化，将重新生成所有缩略图")
+            return {}
+        return index
+
+    def _source_hashes(self):
+        """
+        当前所有头像的内容哈希
+
+        优先使用 AvatarSync 的 manifest，manifest 中没有的头像（例如本次下载失败保留的旧文件）再读文件计算
+        """
+        manifest = {}
+        manifest_file = self.avatars_dir / MANIFEST_FILENAME
+        if manifest_file.exists():
+            try:
+                with open(manifest_file, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError):
+                manifest = {}
+
+        hashes = {}
+        for path in sorted(self.avatars_dir.glob('*.jpg')):
+            digest = (manifest.get(path.stem) or {}).get('sha256')
+            hashes[path.stem] = digest or content_hash(path.read_bytes())
+        return hashes
+
+    def thumb_path(self, size, username):
+        return self.thumbs_dir / str(size) / f"{username}.{THUMB_FORMAT}"
+
+    def sheet_name(self, size, sheet):
+        return f"{size}-{sheet}.{THUMB_FORMAT}"
+
+    def _generate(self, username):
+        """生成一个用户所有尺寸的缩略图，源文件无法解码时返回 False"""
+        try:
+            with Image.open(self.avatars_dir / f"{username}.jpg") as source:
+                image = _square(source.convert('RGB'))
+            for size in self.sizes:
+                thumb = image.resize((size, size), Image.LANCZOS)
+                _write_atomic(thumb, self.thumb_path(size, username), quality=THUMB_QUALITY, method=6)
+            return True
+        except (OSError, ValueError) as e:
+            print(f"  ⚠️  生成缩略图失败 {username}: {e}")
+            return False
+
+    def _remove_thumbs(self, username):
+        for size in self.sizes:
+            path = self.thumb_path(size, username)
+            if path.exists():
+                path.unlink()
+
+    @staticmethod
+    def _assign_slots(slots, usernames):
+        """保留已有槽位，新用户按用户名顺序填入最小的空槽位"""
+        used = set(slots.values())
+        free = (slot for slot in range(len(used) + len(usernames)) if slot not in used)
+        for username in sorted(usernames):
+            slots[username] = next(free)
+        return slots
+
+    def _build_sheet(self, size, sheet, slots):
+        """拼一张雪碧图，空槽位保持透明"""
+        canvas = Image.new('RGBA', (self.columns * size, self.rows * size), (0, 0, 0, 0))
+        first = sheet * self.capacity
+        for username, slot in slots.items():
+            if not first <= slot < first + self.capacity:
+                continue
+            offset = slot - first
+            with Image.open(self.thumb_path(size, username)) as thumb:
+                canvas.paste(thumb.convert('RGBA'), ((offset % self.columns) * size, (offset // self.columns) * size))
+        _write_atomic(canvas, self.sprites_dir / self.sheet_name(size, sheet), quality=THUMB_QUALITY, method=6)
+        self.stats['sheets'] += 1
+
+    def build(self):
+        """
+        增量更新缩略图、雪碧图和 sprites.json
+
+        Returns:
+            是否执行了生成（没有安装 Pillow 或没有头像时返回 False）
+        """
+        if Image is None:
+            print("⚠️  未安装 Pillow，跳过头像缩略图和雪碧图生成")
+            return False
+        if not self.avatars_dir.exists():
+            return False
+
+        index = self._load_index()
+        old_hashes = index.get('hashes', {})
+        slots = dict(index.get('slots', {}))
+        hashes = self._source_hashes()
+
+        # 已不存在的头像：删除缩略图，空出槽位
+        dirty_slots = set()
+        for username in [username for username in slots if username not in hashes]:
+            self._remove_thumbs(username)
+            dirty_slots.add(slots.pop(username))
+            self.stats['removed'] += 1
+
+        # 内容哈希变化、新增或缩略图缺失的头像重新生成
+        for username, digest in hashes.items():
+            missing = any(not self.thumb_path(size, username).exists() for size in self.sizes)
+            if old_hashes.get(username) == digest and username in slots and not missing:
+                continue
+            if self._generate(username):
+                self.stats['generated'] += 1
+                if username in slots:
+                    dirty_slots.add(slots[username])
+            else:
+                self.stats['failed'] += 1
+                self._remove_thumbs(username)
+                if username in slots:
+                    dirty_slots.add(slots.pop(username))
+                hashes[username] = None
+
+        new_users = [username for username, digest in hashes.items() if digest and username not in slots]
+        self._assign_slots(slots, new_users)
+        dirty_slots.update(slots[username] for username in new_users)
+
+        # 只重拼包含变化槽位的雪碧图，雪碧图文件缺失时也重拼
+        sheet_count = (max(slots.values()) // self.capacity + 1) if slots else 0
+        dirty_sheets = {slot // self.capacity for slot in dirty_slots if slot // self.capacity < sheet_count}
+        for size in self.sizes:
+            for sheet in range(sheet_count):
+                if sheet in dirty_sheets or not (self.sprites_dir / self.sheet_name(size, sheet)).exists():
+                    self._build_sheet(size, sheet, slots)
+
+        # 删除多余的雪碧图（成员减少后末尾的图已为空）
+        if self.sprites_dir.exists():
+            expected = {self.sheet_name(size, sheet) for size in self.sizes for sheet in range(sheet_count)}
+            for path in self.sprites_dir.glob(f"*.{THUMB_FORMAT}"):
+                if path.name not in expected:
+                    path.unlink()
+
+        self._save_index(slots, hashes, sheet_count)
+        return True
+
+    def _save_index(self, slots, hashes, sheet_count):
+        """写入 sprites.json（按用户名排序，内容不变时文件也不变）"""
+        offsets = {}
+        for size in self.sizes:
+            offsets[str(size)] = {}
+            for username, slot in sorted(slots.items()):
+                offset = slot % self.capacity
+                offsets[str(size)][username] = {
+                    'sheet': f"avatars/sprites/{self.sheet_name(size, slot // self.capacity)}",
+                    'x': (offset % self.columns) * size,
+                    'y': (offset // self.columns) * size,
+                }
+
+        index = {
+            'format': THUMB_FORMAT,
+            'sizes': list(self.sizes),
+            'columns': self.columns,
+            'rows': self.rows,
+            'sheets': {
+                str(size): [f"avatars/sprites/{self.sheet_name(size, sheet)}" for sheet in range(sheet_count)]
+                for size in self.sizes
+            },
+            'offsets': offsets,
+            'slots': dict(sorted(slots.items())),
+            'hashes': {username: hashes[username] for username in sorted(slots)},
+        }
+        self.sprites_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_file.with_name(f"{SPRITE_INDEX_FILENAME}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.index_file)
+
+    def report(self):
+        """打印本次生成的统计"""
+        s = self.stats
+        print(f"  - 头像缩略图: 生成 {s['generated']}，删除 {s['removed']}，失败 {s['failed']}，重拼雪碧图 {s['sheets']} 张")
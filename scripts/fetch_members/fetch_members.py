@@ -8,6 +8,8 @@ import os
 import sys
 import csv
 import json
+import sqlite3
+import threading
 import time
 from datetime import datetime, timedelta
 from collections import defaultdict
@@ -20,6 +22,9 @@ from pathlib import Path
 # 添加父目录到路径，以便导入共享模块
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from bot_filter import is_bot_account
+from github_api import CostPlan, GitHubClient, ResponseCache, load_tokens
+from avatar_sync import AvatarSync
+from avatar_thumbs import AvatarThumbnails
 
 # 加载环境变量
 try:
@@ -32,14 +37,19 @@ except ImportError:
 # 配置
 CONFIG = {
     'ORG_NAME': os.getenv('GITHUB_ORG', 'datawhalechina'),
-    'GITHUB_TOKEN': os.getenv('GITHUB_TOKEN'),
+    # Token 池：GITHUB_TOKENS（逗号分隔）、GITHUB_TOKENS_FILE（每行一个）和 GITHUB_TOKEN
+    'GITHUB_TOKENS': load_tokens(),
     'OUTPUT_FILE': Path(__file__).parent.parent.parent / 'docs' / 'public' / 'data' / 'members.csv',
     'OUTPUT_JSON_FILE': Path(__file__).parent.parent.parent / 'docs' / 'public' / 'data' / 'members.json',
     # 周commit数据文件
     'COMMITS_FILE': Path(__file__).parent.parent.parent / 'docs' / 'public' / 'data' / 'commits_weekly.json',
     # 头像缓存目录
     'AVATARS_DIR': Path(__file__).parent.parent.parent / 'docs' / 'public' / 'avatars',
+    # GitHub API 条件请求缓存目录（ETag / Last-Modified）
+    'HTTP_CACHE_DIR': Path(os.getenv('GITHUB_CACHE_DIR', Path(__file__).parent.parent.parent / '.cache' / 'github_api')),
     'API_BASE': 'https://api.github.com',
+    # 成员信息快照：超过该小时数或参与的组织仓库变化时才重新获取用户信息
+    'SNAPSHOT_TTL_HOURS': float(os.getenv('MEMBER_SNAPSHOT_TTL_HOURS', '72')),
     # 最小贡献行数阈值（降低以包含更多贡献者）
     # 修改为 0，确保所有贡献者都被采集，包括只有少量代码变更的新贡献者
     # 注意：GitHub API 的 contributions 字段表示代码行数变更，不是 commit 数量
@@ -49,6 +59,10 @@ CONFIG = {
     'MAX_USER_REPOS': 100,  # 获取用户仓库的最大数量
     'COMMIT_DAYS_RANGE': 7,  # 获取最近N天的commit数据
     'MAX_COMMITS_PER_REPO': 200,  # 每个仓库最大commit数
+    'MAX_WORKERS': int(os.getenv('GITHUB_MAX_WORKERS', '8')),  # 最大并发请求数
+    # 使用 GraphQL 批量获取用户信息（需要 Token，未配置时回退到 REST）
+    'USE_GRAPHQL': os.getenv('USE_GRAPHQL', '1') != '0',
+    'GRAPHQL_BATCH_SIZE': int(os.getenv('GRAPHQL_BATCH_SIZE', '50')),  # 每次 GraphQL 查询的用户数
     # topic/关键词 → 领域映射（用于 bio、topics、仓库名匹配）
     'DEFAULT_DOMAINS': {
         'machine-learning': '机器学习',
@@ -193,63 +207,30 @@ CONFIG = {
 }
 
 
-def get_headers():
-    """获取请求头"""
-    headers = {
-        'User-Agent': 'members-visualization-bot',
-        'Accept': 'application/vnd.github.v3+json'
-    }
+_client = None
 
-    if CONFIG['GITHUB_TOKEN']:
-        headers['Authorization'] = f"Bearer {CONFIG['GITHUB_TOKEN']}"
 
-    return headers
+def get_client():
+    """获取共享的 GitHub 客户端（首次调用时创建）"""
+    global _client
+    if _client is None:
+        if not CONFIG['GITHUB_TOKENS']:
+            print("⚠️  未设置 GITHUB_TOKEN，可能会遇到 API 速率限制")
+        _client = GitHubClient(
+            tokens=CONFIG['GITHUB_TOKENS'],
+            user_agent='members-visualization-bot',
+            accept='application/vnd.github.v3+json',
+            api_base=CONFIG['API_BASE'],
+            max_workers=CONFIG['MAX_WORKERS'],
+            cache=ResponseCache(CONFIG['HTTP_CACHE_DIR']),
+            verbose=True,
+        )
+    return _client
 
 
-def fetch_api(url, retries=3):
+def fetch_api(url):
     """发送 API 请求（带重试逻辑）"""
-    if not CONFIG['GITHUB_TOKEN']:
-        print("⚠️  未设置 GITHUB_TOKEN，可能会遇到 API 速率限制")
-
-    for attempt in range(retries):
-        try:
-            print(f"🔄 请求 {url} (尝试 {attempt + 1}/{retries})")
-
-            response = requests.get(url, headers=get_headers(), timeout=30)
-
-            # 检查速率限制
-            remaining = response.headers.get('X-RateLimit-Remaining')
-            reset_time = response.headers.get('X-RateLimit-Reset')
-
-            if remaining:
-                print(f"📊 API 剩余请求次数: {remaining}")
-
-            if response.status_code == 403 and remaining == '0':
-                if reset_time and attempt < retries - 1:
-                    reset_timestamp = int(reset_time)
-                    wait_time = reset_timestamp - int(time.time()) + 1
-                    if wait_time > 0:
-                        print(f"⏳ API 速率限制，等待 {wait_time} 秒后重试...")
-                        time.sleep(wait_time)
-                        continue
-                raise requests.exceptions.HTTPError(f"API 速率限制已达上限")
-
-            response.raise_for_status()
-            return response.json()
-
-        except requests.RequestException as e:
-            print(f"❌ 请求失败 (尝试 {attempt + 1}/{retries}): {url}")
-            print(f"错误: {e}")
-
-            if attempt == retries - 1:
-                return None
-
-            # 指数退避延迟
-            wait_time = (2 ** attempt)
-            print(f"⏳ 等待 {wait_time} 秒后重试...")
-            time.sleep(wait_time)
-
-    return None
+    return get_client().fetch_api(url)
 
 
 def get_org_repos(org_name):
@@ -257,16 +238,17 @@ def get_org_repos(org_name):
     print(f"正在获取组织 {org_name} 的仓库列表...")
 
     all_repos = []
-    page = 1
     per_page = CONFIG['MAX_REPOS_PER_PAGE']
 
-    while True:
-        url = f"{CONFIG['API_BASE']}/orgs/{org_name}/repos?per_page={per_page}&page={page}&type=public&sort=updated"
-        repos = fetch_api(url)
-
-        if not repos or len(repos) == 0:
-            break
+    # 安全限制：最多获取20页（2000个仓库）
+    pages = get_client().paginate(
+        f"{CONFIG['API_BASE']}/orgs/{org_name}/repos",
+        params={'type': 'public', 'sort': 'updated'},
+        per_page=per_page,
+        max_pages=20,
+    )
 
+    for page, repos in enumerate(pages, start=1):
         # 过滤掉 fork 的仓库，只保留原创仓库
         original_repos = [
             repo for repo in repos if not repo.get('fork', False)]
@@ -281,16 +263,8 @@ def get_org_repos(org_name):
             all_repos = all_repos[:CONFIG.get('TEST_MAX_REPOS', 5)]  # 确保不超过限制
             break
 
-        # 如果返回的仓库数少于每页限制，说明已经是最后一页
-        if len(repos) < per_page:
-            break
-
-        page += 1
-
-        # 安全限制：最多获取20页（2000个仓库）
-        if page > 20:
-            print("⚠️ 达到页数限制，停止获取")
-            break
+    if len(pages) == 20 and len(pages[-1]) == per_page:
+        print("⚠️ 达到页数限制，停止获取")
 
     print(f"总共找到 {len(all_repos)} 个原创仓库")
     return all_repos
@@ -298,29 +272,18 @@ def get_org_repos(org_name):
 
 def get_repo_contributors(org_name, repo_name):
     """获取仓库贡献者（过滤机器人账户）"""
-    all_contributors = []
-    page = 1
     per_page = 100
 
-    while True:
-        url = f"{CONFIG['API_BASE']}/repos/{org_name}/{repo_name}/contributors?per_page={per_page}&page={page}"
-        contributors = fetch_api(url)
-
-        if not contributors or len(contributors) == 0:
-            break
-
-        all_contributors.extend(contributors)
-
-        # 如果返回的贡献者数少于每页限制，说明已经是最后一页
-        if len(contributors) < per_page:
-            break
-
-        page += 1
+    # 安全限制：最多获取10页（1000个贡献者）
+    pages = get_client().paginate(
+        f"{CONFIG['API_BASE']}/repos/{org_name}/{repo_name}/contributors",
+        per_page=per_page,
+        max_pages=10,
+    )
+    all_contributors = [contributor for page in pages for contributor in page]
 
-        # 安全限制：最多获取10页（1000个贡献者）
-        if page > 10:
-            print(f"    ⚠️ 仓库 {repo_name} 贡献者过多，已达页数限制")
-            break
+    if len(pages) == 10 and len(pages[-1]) == per_page:
+        print(f"    ⚠️ 仓库 {repo_name} 贡献者过多，已达页数限制")
 
     # 过滤掉贡献数低于阈值的贡献者和机器人账户
     qualified_contributors = []
@@ -388,10 +351,6 @@ def collect_contributors_from_repos(org_name):
                 contributors_data[username]['total_contributions'] += contributions
                 contributors_data[username]['repo_contributions'][repo_name] = contributions
 
-            # API 速率限制控制
-            delay = 0.1 if CONFIG['GITHUB_TOKEN'] else 0.5
-            time.sleep(delay)
-
         except Exception as e:
             print(f"  ⚠️ 处理仓库 {repo_name} 时出错: {e}")
             continue
@@ -400,82 +359,194 @@ def collect_contributors_from_repos(org_name):
     return contributors_data
 
 
+_avatar_sync = None
+
+
+def get_avatar_sync():
+    """获取共享的头像同步器（首次调用时创建）"""
+    global _avatar_sync
+    if _avatar_sync is None:
+        _avatar_sync = AvatarSync(get_client(), CONFIG['AVATARS_DIR'])
+    return _avatar_sync
+
+
 def download_avatar(avatar_url, username):
-    """下载并缓存用户头像"""
+    """同步用户头像（条件请求，内容变化时才重写文件），返回本地相对路径"""
     if not avatar_url or not requests:
         return None
+    return get_avatar_sync().sync_one(username, avatar_url)
 
-    # 确保头像目录存在
-    CONFIG['AVATARS_DIR'].mkdir(parents=True, exist_ok=True)
 
-    # 头像文件路径
-    avatar_filename = f"{username}.jpg"
-    avatar_path = CONFIG['AVATARS_DIR'] / avatar_filename
+def get_user_details(username):
+    """获取用户详细信息"""
+    url = f"{CONFIG['API_BASE']}/users/{username}"
+    return fetch_api(url)
 
-    # 如果头像已存在，直接返回相对路径
-    if avatar_path.exists():
-        return f"avatars/{avatar_filename}"
 
-    try:
-        print(f"  📸 下载头像: {username}")
-        response = requests.get(avatar_url, timeout=30)
-        response.raise_for_status()
+def get_user_repos(username, max_repos=None):
+    """获取用户仓库信息"""
+    if max_repos is None:
+        max_repos = CONFIG['MAX_USER_REPOS']
 
-        with open(avatar_path, 'wb') as f:
-            f.write(response.content)
+    url = f"{CONFIG['API_BASE']}/users/{username}/repos?sort=updated&per_page={max_repos}"
+    repos = fetch_api(url)
+    return repos if repos else []
 
-        return f"avatars/{avatar_filename}"
-    except Exception as e:
-        print(f"  ⚠️ 头像下载失败 {username}: {e}")
-        return None
 
+# GraphQL 只投影成员统计需要的字段，与 REST 的 /users/{login} 和 /users/{login}/repos 对应
+GRAPHQL_MEMBER_FIELDS = '''
+fragment MemberFields on User {
+  login
+  name
+  bio
+  location
+  company
+  avatarUrl
+  followers { totalCount }
+  following { totalCount }
+  repositories(ownerAffiliations: OWNER, privacy: PUBLIC) { totalCount }
+  recentRepos: repositories(first: %d, ownerAffiliations: OWNER, privacy: PUBLIC,
+                            orderBy: {field: UPDATED_AT, direction: DESC}) {
+    nodes {
+      name
+      stargazerCount
+      repositoryTopics(first: 20) { nodes { topic { name } } }
+    }
+  }
+}
+'''
 
-def ensure_avatar_exists(username, avatar_url):
-    """确保指定用户的头像文件存在，如果不存在则下载"""
-    if not username or not avatar_url:
-        return False
 
-    # 确保头像目录存在
-    CONFIG['AVATARS_DIR'].mkdir(parents=True, exist_ok=True)
+def build_users_graphql_query(count):
+    """构造批量查询 count 个用户的 GraphQL 语句（用户名通过变量传入）"""
+    params = ', '.join(f"$u{i}: String!" for i in range(count))
+    aliases = '\n'.join(f"  u{i}: user(login: $u{i}) {{ ...MemberFields }}" for i in range(count))
+    fragment = GRAPHQL_MEMBER_FIELDS % CONFIG['MAX_USER_REPOS']
+    return f"query({params}) {{\n{aliases}\n}}\n{fragment}"
 
-    # 头像文件路径
-    avatar_filename = f"{username}.jpg"
-    avatar_path = CONFIG['AVATARS_DIR'] / avatar_filename
 
-    # 如果头像已存在，无需下载
-    if avatar_path.exists():
-        return True
+def convert_graphql_user(node):
+    """
+    将 GraphQL 用户节点转换为 REST 格式的 (user_details, user_repos)
+    保证 calculate_user_stats 和 infer_domains_from_repos 无需修改
+    """
+    user_details = {
+        'login': node['login'],
+        'name': node.get('name'),
+        'bio': node.get('bio'),
+        'location': node.get('location'),
+        'company': node.get('company'),
+        'avatar_url': node.get('avatarUrl'),
+        'public_repos': node['repositories']['totalCount'],
+        'followers': node['followers']['totalCount'],
+        'following': node['following']['totalCount'],
+    }
+    user_repos = [
+        {
+            'name': repo['name'],
+            'stargazers_count': repo['stargazerCount'],
+            'topics': [t['topic']['name'] for t in repo['repositoryTopics']['nodes']],
+        }
+        for repo in node['recentRepos']['nodes']
+    ]
+    return user_details, user_repos
 
-    try:
-        # 静默下载头像，避免过多输出
-        response = requests.get(avatar_url, timeout=10)
-        response.raise_for_status()
 
-        with open(avatar_path, 'wb') as f:
-            f.write(response.content)
+def get_users_via_graphql(usernames, batch_size=None):
+    """
+    通过 GraphQL 批量获取用户信息和仓库统计
 
-        print(f"      📸 新增头像: {username}")
-        return True
+    Returns:
+        {username: (user_details, user_repos)}，查询失败或不存在的用户不在结果中
+    """
+    if batch_size is None:
+        batch_size = CONFIG['GRAPHQL_BATCH_SIZE']
+    batches = [usernames[i:i + batch_size] for i in range(0, len(usernames), batch_size)]
+
+    def fetch_batch(batch):
+        variables = {f"u{i}": login for i, login in enumerate(batch)}
+        result = get_client().graphql(build_users_graphql_query(len(batch)), variables)
+        if not result or not result.get('data'):
+            print(f"  ⚠️ GraphQL 批量查询失败（{len(batch)} 个用户），将回退到 REST")
+            return {}
+        profiles = {}
+        for i, login in enumerate(batch):
+            node = result['data'].get(f"u{i}")
+            if node:
+                profiles[login] = convert_graphql_user(node)
+        return profiles
+
+    print(f"🔎 GraphQL 批量获取 {len(usernames)} 个用户信息（{len(batches)} 次查询）...")
+    profiles = {}
+    for batch_profiles in get_client().map(fetch_batch, batches):
+        profiles.update(batch_profiles)
+    print(f"  ✓ GraphQL 获取成功: {len(profiles)}/{len(usernames)} 个用户")
+    return profiles
+
+
+class SnapshotStore:
+    """
+    成员信息快照 - 保存每个用户上次获取的用户信息和个人仓库
 
-    except Exception as e:
-        # 静默处理错误，避免中断数据收集流程
-        return False
+    与响应缓存放在同一目录（member_snapshots.sqlite3），工作流缓存该目录即可跨运行保留；
+    每条快照记录获取时间和当时参与的组织仓库，用于判断是否需要重新获取
+    """
 
+    def __init__(self, cache_dir, ttl_hours=None):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl = (CONFIG['SNAPSHOT_TTL_HOURS'] if ttl_hours is None else ttl_hours) * 3600
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.cache_dir / 'member_snapshots.sqlite3'), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS snapshots (
+                username TEXT PRIMARY KEY,
+                org_repos TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                data TEXT NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def get(self, username):
+        """读取快照，不存在时返回 None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT org_repos, fetched_at, data FROM snapshots WHERE username = ?', (username,)).fetchone()
+        if row is None:
+            return None
+        data = json.loads(row[2])
+        return {
+            'org_repos': json.loads(row[0]),
+            'fetched_at': row[1],
+            'user_details': data['user_details'],
+            'user_repos': data['user_repos'],
+        }
 
-def get_user_details(username):
-    """获取用户详细信息"""
-    url = f"{CONFIG['API_BASE']}/users/{username}"
-    return fetch_api(url)
+    def is_fresh(self, snapshot, org_repos=None):
+        """快照在 TTL 内，且参与的组织仓库没有变化（org_repos 为 None 时只看时间）"""
+        if snapshot is None or time.time() - snapshot['fetched_at'] >= self.ttl:
+            return False
+        return org_repos is None or snapshot['org_repos'] == sorted(org_repos)
 
+    def set(self, username, org_repos, user_details, user_repos):
+        """保存快照（在 save() 时提交）"""
+        data = json.dumps({'user_details': user_details, 'user_repos': user_repos}, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO snapshots (username, org_repos, fetched_at, data) VALUES (?, ?, ?, ?)',
+                (username, json.dumps(sorted(org_repos), ensure_ascii=False), time.time(), data),
+            )
 
-def get_user_repos(username, max_repos=None):
-    """获取用户仓库信息"""
-    if max_repos is None:
-        max_repos = CONFIG['MAX_USER_REPOS']
+    def save(self):
+        with self._lock:
+            self._conn.commit()
 
-    url = f"{CONFIG['API_BASE']}/users/{username}/repos?sort=updated&per_page={max_repos}"
-    repos = fetch_api(url)
-    return repos if repos else []
+    def close(self):
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
 
 
 def calculate_user_stats(user_details, user_repos):
@@ -750,7 +821,8 @@ def main():
     print(f"📁 输出文件: {CONFIG['OUTPUT_FILE']}, {CONFIG['OUTPUT_JSON_FILE']}")
     print(f"📊 Commit数据文件: {CONFIG['COMMITS_FILE']}")
     print(f"🏢 组织名称: {CONFIG['ORG_NAME']}")
-    print(f"🔑 Token 状态: {'已配置' if CONFIG['GITHUB_TOKEN'] else '未配置'}")
+    token_count = len(CONFIG['GITHUB_TOKENS'])
+    print(f"🔑 Token 状态: {f'已配置 {token_count} 个' if token_count else '未配置'}")
 
     # 当未安装 requests 时优雅降级
     if requests is None:
@@ -770,7 +842,7 @@ def main():
             backup_existing_data()
 
         # 统一数据收集（同时获取成员和commit数据）
-        contributors_data, all_commits, org_repos_cache, api_stats = collect_unified_data(
+        contributors_data, all_commits, org_repos_cache, api_stats, collected_all = collect_unified_data(
             CONFIG['ORG_NAME'], include_commits=True)
 
         if not contributors_data:
@@ -787,26 +859,79 @@ def main():
         if all_commits:
             user_commits_agg = aggregate_commits_by_user(all_commits)
 
-        # 处理成员数据
-        print(f"\n👥 开始处理 {len(contributors_data)} 个成员的详细信息...")
+        # 快照在 TTL 内且参与的组织仓库没有变化的成员直接使用快照，不再请求用户信息
+        snapshot_store = SnapshotStore(CONFIG['HTTP_CACHE_DIR'])
+        snapshots = {}
+        for username, contrib_info in contributors_data.items():
+            snapshot = snapshot_store.get(username)
+            if snapshot_store.is_fresh(snapshot, contrib_info['repos']):
+                snapshots[username] = snapshot
+        stale_usernames = [username for username in contributors_data if username not in snapshots]
+        print(f"♻️  成员快照: {len(snapshots)} 个仍有效，{len(stale_usernames)} 个需要获取"
+              f"（TTL {CONFIG['SNAPSHOT_TTL_HOURS']:g} 小时）")
+
+        # 批量获取用户信息（GraphQL），失败或缺失的用户在循环中回退到 REST
+        graphql_profiles = {}
+        if CONFIG['USE_GRAPHQL'] and CONFIG['GITHUB_TOKENS'] and stale_usernames:
+            graphql_profiles = get_users_via_graphql(stale_usernames)
+            graphql_calls = -(-len(stale_usernames) // CONFIG['GRAPHQL_BATCH_SIZE'])
+            api_stats['graphql'] += graphql_calls
+            api_stats['total'] += graphql_calls
+
+        def fetch_member(item):
+            """
+            并发阶段：获取用户信息（快照和 GraphQL 都没有时走 REST）并下载头像，不修改共享数据
+
+            Returns:
+                (user_details, user_repos, 是否调用了 REST, 本地头像路径, 异常)
+            """
+            username, contrib_info = item
+            try:
+                via_rest = False
+                if username in snapshots:
+                    user_details = snapshots[username]['user_details']
+                    user_repos = snapshots[username]['user_repos']
+                elif username in graphql_profiles:
+                    user_details, user_repos = graphql_profiles[username]
+                else:
+                    # 获取用户详细信息和用户仓库信息
+                    user_details = get_user_details(username)
+                    user_repos = get_user_repos(username)
+                    via_rest = True
+
+                # 下载并缓存头像
+                avatar_url = user_details.get(
+                    'avatar_url') if user_details else contrib_info['user_info'].get('avatar_url')
+                local_avatar = download_avatar(avatar_url, username)
+                return user_details, user_repos, via_rest, local_avatar, None
+            except Exception as e:
+                return None, None, False, None, e
+
+        # 处理成员数据：请求和头像下载在有界线程池中并发进行，
+        # 计算步骤按成员顺序依次处理已完成的结果，输出顺序与串行处理相同
+        print(f"\n👥 开始处理 {len(contributors_data)} 个成员的详细信息（并发数: {get_client().max_workers}）...")
         processed_members = []
 
-        for username, contrib_info in contributors_data.items():
+        member_results = get_client().imap(fetch_member, contributors_data.items())
+        for (username, contrib_info), result in zip(contributors_data.items(), member_results):
             print(f"\n👤 处理成员: {username}")
+            user_details, user_repos, via_rest, local_avatar, error = result
 
             try:
-                # 获取用户详细信息
-                user_details = get_user_details(username)
-                api_stats['users'] += 1
-                api_stats['total'] += 1
+                if error is not None:
+                    raise error
+
+                if via_rest:
+                    api_stats['users'] += 1
+                    api_stats['user_repos'] += 1
+                    api_stats['total'] += 2
+
+                # 只保存成功获取的用户信息，失败的用户下次运行重新获取
+                if user_details and username not in snapshots:
+                    snapshot_store.set(username, contrib_info['repos'], user_details, user_repos)
 
                 if user_details:
                     print(f"  ✓ 获取用户信息: {user_details.get('name', 'N/A')}")
-
-                # 获取用户仓库信息
-                user_repos = get_user_repos(username)
-                api_stats['user_repos'] += 1
-                api_stats['total'] += 1
                 print(f"  ✓ 获取用户仓库: {len(user_repos) if user_repos else 0} 个")
 
                 # 计算用户统计信息（个人仓库数据）
@@ -820,11 +945,6 @@ def main():
                 print(
                     f"  ✓ 组织贡献: {org_stats['org_repos_count']} 个仓库, {org_stats['org_total_stars']} Stars, {org_stats['org_total_contributions']} 贡献数")
 
-                # 下载并缓存头像
-                avatar_url = user_details.get(
-                    'avatar_url') if user_details else contrib_info['user_info'].get('avatar_url')
-                local_avatar = download_avatar(avatar_url, username)
-
                 # 推断研究方向（基于仓库 topics、参与的仓库名称和用户简介）
                 user_bio = user_details.get('bio') if user_details else ''
                 domains = infer_domains_from_repos(
@@ -864,6 +984,24 @@ def main():
                 print(f"  ❌ 处理成员 {username} 时出错: {e}")
                 continue
 
+        snapshot_store.close()
+
+        # 删除已不在贡献者列表中的用户的头像；测试模式只处理部分仓库，
+        # 有仓库数据获取失败时成员列表可能不完整，都不删除
+        avatar_sync = get_avatar_sync()
+        if not CONFIG.get('TEST_MODE'):
+            if collected_all and contributors_data:
+                removed = avatar_sync.prune(contributors_data.keys())
+                if removed:
+                    print(f"🗑️  已删除 {removed} 个不再是成员的用户的头像")
+            else:
+                print("⚠️  部分仓库数据获取失败，本次不删除头像")
+        avatar_sync.save()
+
+        # 按内容哈希增量生成缩略图和雪碧图
+        avatar_thumbs = AvatarThumbnails(CONFIG['AVATARS_DIR'])
+        avatar_thumbs.build()
+
         if processed_members:
             # 保存成员数据
             save_to_csv(processed_members, CONFIG['OUTPUT_FILE'])
@@ -895,6 +1033,12 @@ def main():
             print(f"\n🎉 执行完成!")
             print(f"📊 性能统计:")
             print(f"  - 总API调用: {api_stats['total']} 次")
+            print(f"  - 缓存命中(TTL 内): {get_client().stats['cache_hits']} 次")
+            print(f"  - 缓存命中(304): {get_client().stats['not_modified']} 次")
+            print(f"  - 二级速率限制: {get_client().stats['throttled']} 次（最终并发 {get_client().limiter.limit}）")
+            avatar_sync.report()
+            avatar_thumbs.report()
+            get_client().tokens.report()
             print(f"  - 总执行时间: {total_time:.1f} 秒")
 
         else:
@@ -932,20 +1076,15 @@ def get_recent_commits_for_repo(org_name, repo_name, days=7):
         'per_page': CONFIG['MAX_COMMITS_PER_REPO']
     }
 
-    try:
-        response = requests.get(
-            url, headers=get_headers(), params=params, timeout=30)
-        if response.status_code == 200:
-            commits = response.json()
-            print(f"  📊 仓库 {repo_name}: 获取到 {len(commits)} 个commit")
-            return commits
-        else:
-            print(
-                f"  ⚠️  仓库 {repo_name}: 获取commit失败 (状态码: {response.status_code})")
-            return []
-    except Exception as e:
-        print(f"  ❌ 仓库 {repo_name}: 获取commit异常: {e}")
-        return []
+    response = get_client().get(url, params=params)
+    if response is not None and response.status_code == 200:
+        commits = response.data or []
+        print(f"  📊 仓库 {repo_name}: 获取到 {len(commits)} 个commit")
+        return commits
+
+    status = response.status_code if response is not None else '请求失败'
+    print(f"  ⚠️  仓库 {repo_name}: 获取commit失败 (状态码: {status})")
+    return []
 
 
 def process_commits_data(commits, repo_name):
@@ -1019,9 +1158,6 @@ def collect_weekly_commits_data(org_name, days=7):
 
         processed_repos += 1
 
-        # 添加延迟避免API速率限制
-        time.sleep(0.5)
-
         # 每处理10个仓库显示进度
         if processed_repos % 10 == 0:
             print(f"  ✅ 已处理 {processed_repos}/{len(repos)} 个仓库")
@@ -1122,10 +1258,72 @@ def save_commits_data(commits_data):
         return False
 
 
+def plan():
+    """
+    预估完整运行需要的API调用次数和耗时，不写入任何数据
+
+    仓库列表真实请求一次（TTL 内由缓存满足），其余阶段按仓库数和上次运行的成员数估算，
+    并扣除共享缓存中仍在 TTL 内的请求
+    """
+    print("🧮 预估数据拉取脚本的API开销...")
+    client = get_client()
+    cost_plan = CostPlan(client, f"fetch_members（{CONFIG['ORG_NAME']}）")
+
+    repos = get_org_repos(CONFIG['ORG_NAME'])
+    cost_plan.add("组织仓库列表", -(-len(repos) // CONFIG['MAX_REPOS_PER_PAGE']) or 1)
+
+    contributor_urls = [
+        f"{CONFIG['API_BASE']}/repos/{CONFIG['ORG_NAME']}/{repo['name']}/contributors"
+        f"?per_page={CONFIG['MAX_CONTRIBUTORS_PER_REPO']}"
+        for repo in repos
+    ]
+    contributor_calls = sum(1 for url in contributor_urls if not client.is_cached(url))
+    cost_plan.add("仓库贡献者", contributor_calls,
+                  note=f"缓存命中 {len(contributor_urls) - contributor_calls}/{len(contributor_urls)}")
+    # 最近commit列表每次都重新验证，按每个仓库一次估算
+    cost_plan.add("最近commit", len(repos))
+
+    # 成员数按上次运行的结果估算
+    usernames = []
+    if os.path.exists(CONFIG['OUTPUT_JSON_FILE']):
+        try:
+            with open(CONFIG['OUTPUT_JSON_FILE'], 'r', encoding='utf-8') as f:
+                usernames = [member['id'] for member in json.load(f)]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️  读取上次的成员数据失败: {e}")
+
+    # 快照仍在 TTL 内的成员不需要请求（参与的组织仓库变化时仍会刷新，这里无法预知）
+    snapshot_store = SnapshotStore(CONFIG['HTTP_CACHE_DIR'])
+    fresh = [username for username in usernames if snapshot_store.is_fresh(snapshot_store.get(username))]
+    snapshot_store.close()
+    if fresh:
+        print(f"♻️  成员快照仍有效: {len(fresh)}/{len(usernames)} 个")
+        fresh = set(fresh)
+        usernames = [username for username in usernames if username not in fresh]
+
+    if CONFIG['USE_GRAPHQL'] and CONFIG['GITHUB_TOKENS']:
+        batches = -(-len(usernames) // CONFIG['GRAPHQL_BATCH_SIZE'])
+        cost_plan.add("成员信息（GraphQL）", batches, resource='graphql',
+                      note=f"约 {len(usernames)} 个成员，每批 {CONFIG['GRAPHQL_BATCH_SIZE']} 个")
+    else:
+        user_calls = 0
+        for username in usernames:
+            user_calls += not client.is_cached(f"{CONFIG['API_BASE']}/users/{username}")
+            user_calls += not client.is_cached(
+                f"{CONFIG['API_BASE']}/users/{username}/repos?sort=updated&per_page={CONFIG['MAX_USER_REPOS']}")
+        cost_plan.add("成员信息（REST）", user_calls,
+                      note=f"约 {len(usernames)} 个成员，缓存命中 {len(usernames) * 2 - user_calls}/{len(usernames) * 2}")
+
+    cost_plan.report()
+
+
 def collect_unified_data(org_name, include_commits=False):
     """
     优化的统一数据收集函数
     在单次遍历中同时收集成员信息和commit数据
+
+    Returns:
+        (贡献者数据, commit列表, 组织仓库缓存, API调用统计, 是否所有仓库的数据都获取成功)
     """
     print(f"🚀 开始统一数据收集 (包含commit: {include_commits})...")
 
@@ -1136,6 +1334,7 @@ def collect_unified_data(org_name, include_commits=False):
         'commits': 0,
         'users': 0,
         'user_repos': 0,
+        'graphql': 0,
         'total': 0
     }
     start_time = time.time()
@@ -1148,7 +1347,7 @@ def collect_unified_data(org_name, include_commits=False):
 
     if not repos:
         print("❌ 无法获取组织仓库列表")
-        return None, None, api_calls
+        return None, None, None, api_calls, False
 
     print(f"✅ 找到 {len(repos)} 个仓库")
 
@@ -1164,8 +1363,40 @@ def collect_unified_data(org_name, include_commits=False):
             timedelta(days=CONFIG['COMMIT_DAYS_RANGE'])
         since_iso = since_date.isoformat() + 'Z'
 
-    # 单次遍历所有仓库，同时收集贡献者和commit数据
-    for repo in repos:
+    def fetch_payload(url):
+        """返回 (数据, 是否失败)；404 / 409（空仓库）/ 204 是确定的结果，不算失败"""
+        response = get_client().get(url)
+        if response is None:
+            return None, True
+        return (response.data if response.ok else None), False
+
+    def fetch_repo_payload(repo):
+        """并发阶段：只发请求，不修改共享数据，返回 (贡献者, commit, 是否有请求失败)"""
+        repo_name = repo['name']
+        contributors = None
+        commits = None
+        failed = False
+        try:
+            contributors, failed = fetch_payload(
+                f"{CONFIG['API_BASE']}/repos/{org_name}/{repo_name}/contributors"
+                f"?per_page={CONFIG['MAX_CONTRIBUTORS_PER_REPO']}")
+            if include_commits:
+                commits, commits_failed = fetch_payload(
+                    f"{CONFIG['API_BASE']}/repos/{org_name}/{repo_name}/commits"
+                    f"?since={since_iso}&per_page={CONFIG['MAX_COMMITS_PER_REPO']}")
+                failed = failed or commits_failed
+        except Exception as e:
+            print(f"  ❌ 获取仓库 {repo_name} 数据时出错: {e}")
+            failed = True
+        return contributors, commits, failed
+
+    # 并发获取所有仓库的贡献者和commit数据，之后按仓库顺序串行处理，保证输出稳定
+    print(f"🚀 并发获取 {len(repos)} 个仓库的数据（并发数: {get_client().max_workers}）...")
+    repo_payloads = get_client().map(fetch_repo_payload, repos)
+    failed_repos = [repo['name'] for repo, (_, _, failed) in zip(repos, repo_payloads) if failed]
+
+    # 单次遍历所有仓库，同时处理贡献者和commit数据
+    for repo, (contributors, commits, _) in zip(repos, repo_payloads):
         repo_name = repo['name']
         print(f"\n📦 处理仓库: {repo_name} ({processed_repos + 1}/{len(repos)})")
 
@@ -1179,14 +1410,8 @@ def collect_unified_data(org_name, include_commits=False):
                 'open_issues_count': repo.get('open_issues_count', 0)
             }
 
-            # 1. 获取仓库贡献者信息
-            print(f"  👥 获取贡献者...")
-            contributors_url = f"{CONFIG['API_BASE']}/repos/{org_name}/{repo_name}/contributors"
-            contributors_params = {
-                'per_page': CONFIG['MAX_CONTRIBUTORS_PER_REPO']}
-
-            contributors_full_url = f"{contributors_url}?per_page={contributors_params['per_page']}"
-            contributors = fetch_api(contributors_full_url)
+            # 1. 处理仓库贡献者信息
+            print(f"  👥 处理贡献者...")
             api_calls['contributors'] += 1
             api_calls['total'] += 1
 
@@ -1215,17 +1440,9 @@ def collect_unified_data(org_name, include_commits=False):
                         contributors_data[username]['total_contributions'] += contributor['contributions']
                         contributors_data[username]['repo_contributions'][repo_name] = contributor['contributions']
 
-            # 2. 获取commit数据（如果需要）
+            # 2. 处理commit数据（如果需要）
             if include_commits:
-                print(f"  📊 获取commit数据...")
-                commits_url = f"{CONFIG['API_BASE']}/repos/{org_name}/{repo_name}/commits"
-                commits_params = {
-                    'since': since_iso,
-                    'per_page': CONFIG['MAX_COMMITS_PER_REPO']
-                }
-
-                commits_full_url = f"{commits_url}?since={commits_params['since']}&per_page={commits_params['per_page']}"
-                commits = fetch_api(commits_full_url)
+                print(f"  📊 处理commit数据...")
                 api_calls['commits'] += 1
                 api_calls['total'] += 1
 
@@ -1263,11 +1480,8 @@ def collect_unified_data(org_name, include_commits=False):
                                     f"      🤖 跳过机器人提交: {commit_data['github_username']}")
                                 continue
 
-                            # 检查并下载新发现贡献者的头像
+                            # 新发现的贡献者的头像在成员处理阶段与其他成员一起并发同步
                             if commit_data['github_username'] and commit_data['author_avatar_url']:
-                                ensure_avatar_exists(
-                                    commit_data['github_username'], commit_data['author_avatar_url'])
-
                                 # 如果这个用户不在 contributors_data 中，添加进去
                                 # 这样可以确保所有有 commit 的用户都会被采集到 members.json
                                 if commit_data['github_username'] not in contributors_data:
@@ -1330,8 +1544,12 @@ def collect_unified_data(org_name, include_commits=False):
         print(f"  - 收集commit: {len(all_commits)} 个")
     print(f"  - API调用统计: {api_calls}")
     print(f"  - 总耗时: {elapsed_time:.1f} 秒")
+    if failed_repos:
+        print(f"  ⚠️  {len(failed_repos)} 个仓库的数据获取失败: {', '.join(failed_repos[:10])}"
+              f"{' 等' if len(failed_repos) > 10 else ''}")
 
-    return contributors_data, all_commits if include_commits else None, org_repos_cache, api_calls
+    return (contributors_data, all_commits if include_commits else None, org_repos_cache, api_calls,
+            not failed_repos)
 
 
 def aggregate_commits_by_user(all_commits):
@@ -1490,8 +1708,10 @@ if __name__ == '__main__':
     if len(sys.argv) > 1:
         if sys.argv[1] == '--test':
             test()
+        elif sys.argv[1] == '--plan':
+            plan()
         else:
-            print("❌ 未知参数。支持的参数：--test")
+            print("❌ 未知参数。支持的参数：--test、--plan")
             print("💡 提示：脚本现在默认收集commit数据，无需 --with-commits 参数")
             sys.exit(1)
     else:
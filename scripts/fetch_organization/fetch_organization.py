@@ -1,5 +1,6 @@
 import json
 import os
+import sys
 from datetime import datetime
 from pathlib import Path
 from fetch_organization_from_star_history import fetch_organization_from_star_history
@@ -8,6 +9,10 @@ from analyze_organization import get_top10_knowledge_sharing_organization_info
 from analyze_repo import get_add_star_top3_new_repo, get_add_star_top5_repo, get_repo_add_star_more_than_1000, get_repo_star_more_than_1000
 from utils import ensure_dir_and_write_file, ensure_dir_and_write_files, read_file
 
+# 添加父目录到路径，以便导入共享模块
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from github_api import load_tokens
+
 
 # 加载环境变量
 try:
@@ -49,8 +54,8 @@ def fetch_organization_data(key):
     CONFIG['REPO_DATA_DIR'].mkdir(parents=True, exist_ok=True)
     CONFIG['ORGANIZATION_DATA_DIR'].mkdir(parents=True, exist_ok=True)
 
-    # 加载环境变量
-    github_token = os.getenv('GITHUB_TOKEN')
+    # 加载 Token 池（GITHUB_TOKENS / GITHUB_TOKENS_FILE / GITHUB_TOKEN）
+    github_token = load_tokens()
 
     # 0. 从repo_list.json中加载已有的仓库详情数据
     origin_repo_detail_list = []
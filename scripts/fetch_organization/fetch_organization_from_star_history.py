@@ -1,13 +1,17 @@
-import requests
 from bs4 import BeautifulSoup
 
+from fetch_organization_repo_detail import get_client
+
 
 def get_organization_list(page):
     output = []
     try:
-        response = requests.get(
+        # 通过共享客户端请求，复用连接并支持录制 / 回放
+        html = get_client().download(
             f"https://gitstar-ranking.com/organizations?page={page}")
-        soup = BeautifulSoup(response.text, 'html.parser')
+        if html is None:
+            return []
+        soup = BeautifulSoup(html, 'html.parser')
 
         # 获取两个列的组织数据
         columns = soup.select('div.container > div.row > div')
@@ -1,29 +1,44 @@
 import math
-import requests
+import os
+import sys
 from datetime import datetime
+from pathlib import Path
+
+# 添加父目录到路径，以便导入共享模块
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from github_api import GitHubClient, ResponseCache
+
+# GitHub API 条件请求缓存目录（ETag / Last-Modified）
+HTTP_CACHE_DIR = Path(os.getenv('GITHUB_CACHE_DIR', Path(__file__).parent.parent.parent / '.cache' / 'github_api'))
+
+_clients = {}
+
+
+def get_client(token=''):
+    """按 token（单个 Token 或 Token 列表）获取共享的 GitHub 客户端（首次调用时创建）"""
+    key = token if isinstance(token, str) else tuple(token)
+    if key not in _clients:
+        _clients[key] = GitHubClient(
+            tokens=token or None,
+            user_agent='members-visualization-bot',
+            max_workers=int(os.getenv('GITHUB_MAX_WORKERS', '8')),
+            cache=ResponseCache(HTTP_CACHE_DIR),
+        )
+    return _clients[key]
 
 
 def get_github_repo_by_organization_name(organization_name, token='', ignore_repo_name_list=[]):
     output = []
-    need_next_page = True
-    page = 1
     page_size = 100
 
-    while need_next_page:
-        try:
-            print(f"fetch organization: {organization_name}, page: {page}")
-            headers = {
-                'accept': 'application/vnd.github+json',
-            }
-
-            if token:
-                headers['authorization'] = f'Bearer {token}'
-
-            url = f"https://api.github.com/orgs/{organization_name}/repos?per_page={page_size}&page={page}"
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()  # 抛出HTTP错误
-            data = response.json()
+    try:
+        print(f"fetch organization: {organization_name}")
+        pages = get_client(token).paginate(
+            f"https://api.github.com/orgs/{organization_name}/repos", per_page=page_size)
+        if not pages:
+            raise RuntimeError(f"request failed: {organization_name}")
 
+        for data in pages:
             for item in data:
                 if item['name'] in ignore_repo_name_list:
                     continue
@@ -32,12 +47,8 @@ def get_github_repo_by_organization_name(organization_name, token='', ignore_rep
                     'star_count': item['stargazers_count']
                 })
 
-            need_next_page = len(data) == page_size
-            page += 1
-
-        except Exception as e:
-            print(f"fetch organization error: {organization_name}, {e}")
-            need_next_page = False
+    except Exception as e:
+        print(f"fetch organization error: {organization_name}, {e}")
 
     # 按star_count降序排序
     return sorted(output, key=lambda x: x['star_count'], reverse=True)
@@ -65,26 +76,20 @@ def get_github_star_count(organization_name, repo, token='', monthly_stars={}, m
         output["monthly_stars"] = {}
         output["monthly_total_stars"] = {}
 
-    need_next_page = True
     page_size = 100
     page = math.floor(output['star_count'] / page_size) + 1
     total_stars = output['star_count']
 
-    while need_next_page:
-        try:
-            print(f"fetch repo: {repo}, page: {page}")
-            headers = {
-                'accept': 'application/vnd.github.v3.star+json',
-            }
-
-            if token:
-                headers['authorization'] = f'token {token}'
-
-            url = f"https://api.github.com/repos/{organization_name}/{repo}/stargazers?per_page={page_size}&page={page}"
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            data = response.json()
+    try:
+        print(f"fetch repo: {repo}, from page: {page}")
+        pages = get_client(token).paginate(
+            f"https://api.github.com/repos/{organization_name}/{repo}/stargazers",
+            headers={'Accept': 'application/vnd.github.v3.star+json'},
+            per_page=page_size,
+            start_page=page,
+        )
 
+        for data in pages:
             for item in data:
                 starred_at = item['starred_at']
                 date = datetime.strptime(starred_at, '%Y-%m-%dT%H:%M:%SZ')
@@ -102,12 +107,8 @@ def get_github_star_count(organization_name, repo, token='', monthly_stars={}, m
                 # 更新月度总stars计数
                 output['monthly_total_stars'][month_key] = total_stars
 
-            need_next_page = len(data) == page_size
-            page += 1
-
-        except Exception as e:
-            print(f"fetch repo error: {repo}, {e}")
-            need_next_page = False
+    except Exception as e:
+        print(f"fetch repo error: {repo}, {e}")
 
     output['star_count'] = total_stars
     return output
@@ -154,12 +155,9 @@ def fetch_organization_repo_detail(organization_name, token, ignore_repo_name_li
     repo_list = get_github_repo_by_organization_name(organization_name, token, ignore_repo_name_list)
     print(f"{organization_name} repo_list:", repo_list)
 
-    repo_detail_list = []
-    for repo in repo_list:
+    def fetch_repo_detail(repo):
         # 从full_name中提取仓库名（假设格式为"org/repo"）
         repo_name = repo['name'].split('/')[1]
-        if repo_name in ignore_repo_name_list:
-            continue
         # 从origin_repo_detail_list中查找是否有匹配的仓库详情
         origin_monthly_stars = {}
         origin_monthly_total_stars = {}
@@ -174,8 +172,16 @@ def fetch_organization_repo_detail(organization_name, token, ignore_repo_name_li
                                        origin_monthly_stars, origin_monthly_total_stars, origin_star_count)
         # 增加填充月份的逻辑
         filled_output = fill_missing_months(output, month_key)
-        repo_detail_list.append(filled_output)
         print(f"{organization_name} {repo_name} repo_detail:", filled_output)
+        return filled_output
+
+    # 各仓库的 star 数据互不依赖，并发获取
+    pending_repo_list = [
+        repo for repo in repo_list
+        if repo['name'].split('/')[1] not in ignore_repo_name_list
+    ]
+    repo_detail_list = get_client(token).map(fetch_repo_detail, pending_repo_list)
+    get_client(token).tokens.report()
 
     # 按star_count降序排序
     repo_detail_list.sort(key=lambda x: x['star_count'], reverse=True)
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+GitHub API 共享客户端
+提供连接复用、重试、自适应并发、速率限制调度、多 Token 轮换、共享响应缓存和录制 / 回放，供 fetch_members、quarterly_contributors 和 fetch_organization 共用
+"""
+
+from .cache import ResponseCache
+from .cassette import Cassette
+from .concurrency import AdaptiveLimiter
+from .client import API_BASE, ApiResponse, GitHubClient
+from .planner import CostPlan
+from .rate_limit import RateLimitScheduler
+from .tokens import TokenPool, load_tokens, mask_token
+
+__all__ = [
+    'API_BASE',
+    'AdaptiveLimiter',
+    'ApiResponse',
+    'Cassette',
+    'CostPlan',
+    'GitHubClient',
+    'RateLimitScheduler',
+    'ResponseCache',
+    'TokenPool',
+    'load_tokens',
+    'mask_token',
+]
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+共享响应缓存
+三个流水线共用一个本地 SQLite 数据库，按规范化的 URL 保存响应体及其 ETag / Last-Modified：
+- 在 TTL 内的条目直接使用，不发请求
+- 超过 TTL 后携带 If-None-Match / If-Modified-Since 重新验证，
+  GitHub 返回 304 时继续使用缓存内容（304 不计入速率限制）
+
+TTL 按接口类别配置（见 DEFAULT_TTLS），可用环境变量 GITHUB_CACHE_TTLS 覆盖，例如：
+    GITHUB_CACHE_TTLS="org_repos=600,user=3600"
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+# 接口类别：按顺序匹配 URL 路径，第一个匹配的生效
+ENDPOINT_CLASSES = [
+    ('commit_detail', re.compile(r'^/repos/[^/]+/[^/]+/commits/[0-9a-f]{40}$')),
+    ('org_repos', re.compile(r'^/orgs/[^/]+/repos$')),
+    ('repo_contributors', re.compile(r'^/repos/[^/]+/[^/]+/contributors$')),
+    ('repo_commits', re.compile(r'^/repos/[^/]+/[^/]+/commits$')),
+    ('stargazers', re.compile(r'^/repos/[^/]+/[^/]+/stargazers$')),
+    ('user_repos', re.compile(r'^/users/[^/]+/repos$')),
+    ('user', re.compile(r'^/users/[^/]+$')),
+]
+
+# 各类别的 TTL（秒）：None 表示永不过期，0 表示每次都重新验证
+DEFAULT_TTLS = {
+    'commit_detail': None,  # commit 按 SHA 不可变
+    'org_repos': 3600,
+    'repo_contributors': 6 * 3600,
+    'repo_commits': 0,  # 时间范围内的 commit 列表可能随时变化
+    'stargazers': 0,
+    'user_repos': 24 * 3600,
+    'user': 24 * 3600,
+    'default': 0,
+}
+
+DB_FILENAME = 'responses.sqlite3'
+
+
+def parse_ttls(value):
+    """解析 "类别=秒数,..." 格式的 TTL 配置，秒数为 none 表示永不过期"""
+    ttls = {}
+    for item in (value or '').replace(' ', '').split(','):
+        if '=' not in item:
+            continue
+        name, seconds = item.split('=', 1)
+        ttls[name] = None if seconds.lower() == 'none' else int(seconds)
+    return ttls
+
+
+class ResponseCache:
+    """基于 SQLite 的响应缓存（线程安全，多个进程可同时读写）"""
+
+    def __init__(self, cache_dir, ttls=None):
+        """
+        Args:
+            cache_dir: 缓存目录，数据库文件为其中的 responses.sqlite3
+            ttls: 覆盖部分类别的 TTL，例如 {'org_repos': 600}
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+        self.ttls.update(parse_ttls(os.getenv('GITHUB_CACHE_TTLS')))
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.cache_dir / DB_FILENAME), timeout=30, check_same_thread=False)
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    link TEXT,
+                    fetched_at REAL NOT NULL,
+                    data BLOB
+                )
+            """)
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(url, params=None, accept=None):
+        """生成缓存键：规范化的 URL（查询参数排序）+ 可选的 Accept 媒体类型"""
+        parsed = urlparse(url)
+        query = parse_qsl(parsed.query, keep_blank_values=True)
+        if params:
+            query.extend((str(k), str(v)) for k, v in params.items())
+        url = parsed._replace(query=urlencode(sorted(query))).geturl()
+        return f"{url}|{accept}" if accept else url
+
+    @staticmethod
+    def endpoint_class(key):
+        """根据缓存键判断接口类别"""
+        path = urlparse(key.split('|', 1)[0]).path
+        for name, pattern in ENDPOINT_CLASSES:
+            if pattern.match(path):
+                return name
+        return 'default'
+
+    def ttl_for(self, key):
+        name = self.endpoint_class(key)
+        return self.ttls.get(name, self.ttls.get('default', 0))
+
+    def is_fresh(self, key, entry):
+        """条目是否仍在 TTL 内（可以不发请求直接使用）"""
+        ttl = self.ttl_for(key)
+        if ttl is None:
+            return True
+        return time.time() - entry['fetched_at'] < ttl
+
+    def get(self, key):
+        """读取缓存条目，不存在或损坏时返回 None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT etag, last_modified, link, fetched_at, data FROM responses WHERE key = ?',
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            data = json.loads(zlib.decompress(row[4]).decode('utf-8'))
+        except (zlib.error, ValueError, TypeError):
+            return None
+        return {
+            'key': key,
+            'etag': row[0],
+            'last_modified': row[1],
+            'link': row[2],
+            'fetched_at': row[3],
+            'data': data,
+        }
+
+    def set(self, key, headers, data):
+        """保存响应，只有带 ETag 或 Last-Modified 的响应才值得缓存"""
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+
+        payload = zlib.compress(json.dumps(data, ensure_ascii=False).encode('utf-8'))
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses (key, etag, last_modified, link, fetched_at, data) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                # 304 响应不一定带 Link 头，分页需要用缓存的 Link
+                (key, etag, last_modified, headers.get('Link'), time.time(), payload),
+            )
+            self._conn.commit()
+
+    def touch(self, key):
+        """重新验证通过（304）后刷新条目的获取时间，重新开始计算 TTL"""
+        with self._lock:
+            self._conn.execute('UPDATE responses SET fetched_at = ? WHERE key = ?', (time.time(), key))
+            self._conn.commit()
+
+    @staticmethod
+    def conditional_headers(entry):
+        """根据缓存条目构造条件请求头"""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
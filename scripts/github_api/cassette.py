@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+HTTP 录制 / 回放（cassette）
+- record：正常请求网络，同时把每个请求的响应（状态码、关键响应头、响应体）保存到 cassette 文件
+- replay：完全不访问网络，按请求依次返回录制的响应
+用于在真实数据上反复离线运行、对比各个流水线的耗时，不消耗 API 配额
+
+通过环境变量启用：
+    GITHUB_CASSETTE=path/to/run.cassette.json.gz
+    GITHUB_CASSETTE_MODE=record | replay
+"""
+
+import atexit
+import base64
+import gzip
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from urllib.parse import urlencode, urlparse, parse_qsl
+
+try:
+    import requests
+    from requests.structures import CaseInsensitiveDict
+except ImportError:
+    requests = None
+    CaseInsensitiveDict = dict
+
+MODES = ('record', 'replay')
+
+# 只保存后续处理会用到的响应头，保持 cassette 紧凑
+KEPT_HEADERS = (
+    'Content-Type',
+    'ETag',
+    'Last-Modified',
+    'Link',
+    'Retry-After',
+    'X-RateLimit-Limit',
+    'X-RateLimit-Remaining',
+    'X-RateLimit-Reset',
+    'X-RateLimit-Resource',
+    'X-RateLimit-Used',
+)
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+class CassetteMiss(requests.RequestException if requests else Exception):
+    """回放模式下找不到录制的响应（按请求失败处理，不重试）"""
+
+
+class Cassette:
+    """一个 cassette 文件，线程安全"""
+
+    def __init__(self, path, mode):
+        if mode not in MODES:
+            raise ValueError(f"未知的 cassette 模式: {mode}（可选 {', '.join(MODES)}）")
+        self.path = Path(path)
+        self.mode = mode
+        self.interactions = {}  # 请求键 -> 按发生顺序排列的响应列表
+        self._cursors = {}  # 回放时每个请求键的下一个响应下标
+        self._lock = threading.Lock()
+
+        if mode == 'replay':
+            if not self.path.exists():
+                raise FileNotFoundError(f"cassette 文件不存在: {self.path}")
+            with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+                self.interactions = json.load(f)['interactions']
+            print(f"📼 回放模式: {self.path}（{len(self.interactions)} 个请求）")
+        else:
+            print(f"📼 录制模式: {self.path}")
+            atexit.register(self.save)
+
+    @classmethod
+    def from_env(cls):
+        """根据 GITHUB_CASSETTE / GITHUB_CASSETTE_MODE 返回共享的 cassette，未配置时返回 None"""
+        path = os.getenv('GITHUB_CASSETTE')
+        if not path:
+            return None
+        mode = os.getenv('GITHUB_CASSETTE_MODE', 'replay')
+        with _instances_lock:
+            key = (str(Path(path).resolve()), mode)
+            if key not in _instances:
+                _instances[key] = cls(path, mode)
+            return _instances[key]
+
+    @property
+    def replaying(self):
+        return self.mode == 'replay'
+
+    @staticmethod
+    def make_key(method, url, params=None, headers=None, json_body=None):
+        """
+        请求键：方法 + 规范化的 URL（查询参数排序）+ Accept + 请求体摘要
+        不包含 Authorization 和条件请求头，换 Token 或清空缓存后仍能命中
+        """
+        parsed = urlparse(url)
+        query = parse_qsl(parsed.query, keep_blank_values=True)
+        if params:
+            query.extend((str(k), str(v)) for k, v in params.items())
+        normalized = parsed._replace(query=urlencode(sorted(query))).geturl()
+
+        key = f"{method} {normalized}"
+        accept = (headers or {}).get('Accept')
+        if accept:
+            key += f" |{accept}"
+        if json_body is not None:
+            body = json.dumps(json_body, sort_keys=True, ensure_ascii=False)
+            key += f" #{hashlib.sha1(body.encode('utf-8')).hexdigest()[:16]}"
+        return key
+
+    def record(self, key, response):
+        """保存一次响应"""
+        content = response.content or b''
+        try:
+            body, encoding = content.decode('utf-8'), 'text'
+        except UnicodeDecodeError:
+            body, encoding = base64.b64encode(content).decode('ascii'), 'base64'
+
+        entry = {
+            'status': response.status_code,
+            'headers': {name: response.headers.get(name) for name in KEPT_HEADERS
+                        if response.headers.get(name) is not None},
+            'body': body,
+            'encoding': encoding,
+        }
+        with self._lock:
+            self.interactions.setdefault(key, []).append(entry)
+
+    def play(self, key, url):
+        """
+        返回录制的响应：同一个请求键按录制顺序依次返回，用完后重复最后一个
+
+        Raises:
+            CassetteMiss: 没有录制过该请求
+        """
+        with self._lock:
+            entries = self.interactions.get(key)
+            if not entries:
+                raise CassetteMiss(f"cassette 中没有该请求: {key}")
+            index = self._cursors.get(key, 0)
+            self._cursors[key] = index + 1
+            entry = entries[min(index, len(entries) - 1)]
+
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.url = url
+        if entry['encoding'] == 'base64':
+            response._content = base64.b64decode(entry['body'])
+        else:
+            response._content = entry['body'].encode('utf-8')
+        response.encoding = 'utf-8'
+        return response
+
+    def save(self):
+        """写入 cassette 文件（录制模式在进程退出时自动调用）"""
+        if self.replaying:
+            return
+        with self._lock:
+            payload = {'version': 1, 'interactions': self.interactions}
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+                json.dump(payload, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        total = sum(len(entries) for entries in self.interactions.values())
+        print(f"📼 已保存 {total} 个响应到 {self.path}")
@@ -0,0 +1,504 @@
+#!/usr/bin/env python3
+"""
+GitHub API 客户端
+- 基于 requests.Session 复用 TCP/TLS 连接（keep-alive）
+- 自适应并发（AIMD）：响应正常时逐步增加并发，遇到二级速率限制时减半；
+  被限流的 Token 按 Retry-After 暂停，所有 Token 都被暂停时才暂停全部请求
+- 统一的重试和退避处理
+- 根据 X-RateLimit-* 响应头按资源桶调度请求
+- 多 Token 轮换：按剩余配额选择 Token，被限流时自动切换
+- 可选的共享响应缓存（按接口类别的 TTL + ETag / Last-Modified 条件请求）
+- 分页：先取第一页，根据 Link 头的 rel="last" 并发获取其余页
+- 可选的录制 / 回放（cassette），用于离线复现和性能对比
+"""
+
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlparse
+
+from .cassette import Cassette, CassetteMiss
+from .concurrency import AdaptiveLimiter
+from .rate_limit import RateLimitScheduler
+from .tokens import TokenPool
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    requests = None
+    HTTPAdapter = None
+
+API_BASE = 'https://api.github.com'
+
+# 二级速率限制没有 Retry-After 时的默认等待秒数（GitHub 建议至少 60 秒）
+SECONDARY_LIMIT_WAIT = 60
+
+# 回放时不会等待，录制的限流响应会被重复返回，重新排队次数必须有上限
+REPLAY_MAX_REQUEUES = 10
+
+_LINK_LAST_PATTERN = re.compile(r'<([^>]+)>;\s*rel="last"')
+
+
+def parse_last_page(link):
+    """从 Link 响应头中解析 rel="last" 的页码，没有时返回 None"""
+    match = _LINK_LAST_PATTERN.search(link or '')
+    if not match:
+        return None
+    page = parse_qs(urlparse(match.group(1)).query).get('page')
+    return int(page[0]) if page and page[0].isdigit() else None
+
+
+class ApiResponse:
+    """API 响应（只保留后续处理需要的字段）"""
+
+    def __init__(self, url, status_code, headers, data, from_cache=False, link=None):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.data = data
+        # 是否来自缓存（GitHub 返回了 304）
+        self.from_cache = from_cache
+        # 分页 Link 头（304 时取缓存中的值）
+        self.link = link or headers.get('Link')
+
+    @property
+    def ok(self):
+        return 200 <= self.status_code < 300
+
+    @property
+    def last_page(self):
+        return parse_last_page(self.link)
+
+
+class GitHubClient:
+    """GitHub API 客户端 - 连接池 + 重试 + 有界并发"""
+
+    def __init__(self, tokens=None, user_agent='members-visualization-bot',
+                 accept='application/vnd.github+json', api_base=API_BASE,
+                 max_workers=8, max_retries=3, max_requeues=None, retry_delay=1, timeout=30,
+                 rate_limit_reserve=0, cache=None, cassette=None, verbose=False):
+        """
+        Args:
+            tokens: 单个 GitHub Token 或 Token 列表，仅随 API 请求发送
+            user_agent: User-Agent 请求头
+            accept: 默认 Accept 请求头（单次请求可覆盖）
+            api_base: API 根地址
+            max_workers: 最大并发请求数（同时也是连接池大小），实际并发在其一半和全部之间自适应调整
+            max_retries: 网络错误和服务端错误的最大尝试次数
+            max_requeues: 被速率限制时重新排队的最大次数（不计入 max_retries）；
+                默认不限：每次重新排队前都按 Retry-After / 配额重置时间等待，不会丢弃请求
+            retry_delay: 重试的基础等待秒数（指数退避）
+            timeout: 单次请求超时秒数
+            rate_limit_reserve: 每个 Token 的每个资源桶保留不用的配额
+            cache: 可选的 ResponseCache，TTL 内直接命中，过期后发条件请求
+            cassette: 可选的 Cassette，未指定时读取 GITHUB_CASSETTE 环境变量
+            verbose: 是否打印每次请求的日志
+        """
+        if requests is None:
+            raise RuntimeError("缺少 requests 库，无法创建 GitHub 客户端")
+
+        self.api_base = api_base.rstrip('/')
+        self.max_workers = max(1, int(max_workers))
+        self.max_retries = max(1, int(max_retries))
+        self.max_requeues = None if max_requeues is None else max(0, int(max_requeues))
+        self.retry_delay = retry_delay
+        self.timeout = timeout
+        self.tokens = TokenPool(tokens, reserve=rate_limit_reserve)
+        self.cassette = cassette or Cassette.from_env()
+        # 录制 / 回放时不使用条件请求缓存，保证 cassette 中保存的是完整响应
+        self.cache = None if self.cassette else cache
+        self.verbose = verbose
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'User-Agent': user_agent,
+            'Accept': accept,
+            'X-GitHub-Api-Version': '2022-11-28',
+        })
+
+        # 限制在途请求数，嵌套的 map 调用也不会突破上限
+        self.limiter = AdaptiveLimiter(self.max_workers)
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'errors': 0, 'not_modified': 0, 'cache_hits': 0, 'throttled': 0}
+
+    # ------------------------------------------------------------------
+    # 基础请求
+    # ------------------------------------------------------------------
+
+    def _is_api_url(self, url):
+        return url.startswith(self.api_base)
+
+    def _build_headers(self, url, headers=None, token=None):
+        """构造单次请求头，Token 只发送给 GitHub API"""
+        request_headers = {}
+        if token and self._is_api_url(url):
+            request_headers['Authorization'] = f"Bearer {token}"
+        if headers:
+            request_headers.update(headers)
+        return request_headers
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _send(self, method, url, params=None, headers=None, json_body=None, timeout=None, state=None):
+        """
+        选择 Token 并按速率限制调度后，在并发槽位内发出一次请求
+
+        Returns:
+            (response, token_state)；非 API 请求的 token_state 为 None
+        """
+        if self.cassette and self.cassette.replaying:
+            # 回放：不访问网络，也不按录制时的配额调度
+            self._count('requests')
+            key = Cassette.make_key(method, url, params, headers, json_body)
+            if state is None and self._is_api_url(url):
+                state = self.tokens.states[0]
+            return self.cassette.play(key, url), state
+
+        resource = None
+        if self._is_api_url(url):
+            resource = RateLimitScheduler.resource_for(url)
+            if state is None:
+                state = self.tokens.acquire(resource)
+            else:
+                state.rate_limit.acquire(resource)
+
+        with self.limiter:
+            self._count('requests')
+            response = self.session.request(
+                method,
+                url,
+                params=params,
+                headers=self._build_headers(url, headers, state.token if state else None),
+                json=json_body,
+                timeout=timeout or self.timeout,
+            )
+
+        if self.cassette:
+            self.cassette.record(Cassette.make_key(method, url, params, headers, json_body), response)
+        if state is not None:
+            state.rate_limit.update(response.headers, resource)
+        if not self._is_rate_limited(response) and response.status_code < 500:
+            self.limiter.on_success()
+        return response, state
+
+    @staticmethod
+    def _is_rate_limited(response):
+        """判断 403/429 是否由速率限制（含二级限制）引起"""
+        if response.status_code not in (403, 429):
+            return False
+        if response.status_code == 429 or response.headers.get('X-RateLimit-Remaining') == '0':
+            return True
+        if response.headers.get('Retry-After'):
+            return True
+        return b'rate limit' in (response.content or b'').lower()
+
+    @staticmethod
+    def _is_primary_limited(response):
+        """主速率限制：当前 Token 的配额已经用完"""
+        return response.headers.get('X-RateLimit-Remaining') == '0'
+
+    def _throttle(self, response, url, state):
+        """
+        二级速率限制：降低并发，暂停被限流的 Token 并切换到其他 Token；
+        所有 Token 都被暂停（或不是 API 请求）时按 Retry-After 暂停所有请求
+        """
+        retry_after = response.headers.get('Retry-After')
+        wait = int(retry_after) if retry_after and retry_after.isdigit() else SECONDARY_LIMIT_WAIT
+        self._count('throttled')
+        if state is not None:
+            self.tokens.block(state, response)
+        pause = state is None or self.tokens.all_blocked()
+        limit = self.limiter.on_throttle(wait, pause=pause)
+        if pause:
+            print(f"🐢 触发二级速率限制，并发降至 {limit}，{wait} 秒后重新排队: {url}")
+        else:
+            print(f"🐢 触发二级速率限制，并发降至 {limit}，换用其他 Token 重新排队: {url}")
+
+    @staticmethod
+    def _parse_body(response):
+        if response.status_code == 204 or not response.content:
+            return None
+        return response.json()
+
+    def request(self, method, url, params=None, headers=None, json_body=None):
+        """
+        发送请求（带重试和速率限制处理）
+
+        Returns:
+            ApiResponse；所有尝试均失败时返回 None
+        """
+        cache_key = None
+        cached = None
+        if self.cache is not None and method == 'GET':
+            accept = (headers or {}).get('Accept')
+            cache_key = self.cache.make_key(url, params, accept)
+            cached = self.cache.get(cache_key)
+            if cached and self.cache.is_fresh(cache_key, cached):
+                # 仍在 TTL 内：直接使用缓存，不发请求
+                self._count('cache_hits')
+                return ApiResponse(url, 200, {}, cached['data'], from_cache=True, link=cached.get('link'))
+            if cached:
+                headers = dict(headers or {})
+                headers.update(self.cache.conditional_headers(cached))
+
+        attempt = 0
+        requeues = 0
+        max_requeues = self.max_requeues
+        if max_requeues is None and self.cassette and self.cassette.replaying:
+            max_requeues = REPLAY_MAX_REQUEUES
+        while attempt < self.max_retries:
+            try:
+                if self.verbose:
+                    print(f"🔄 请求 {url} (尝试 {attempt + 1}/{self.max_retries})")
+
+                response, state = self._send(method, url, params, headers, json_body)
+                remaining = response.headers.get('X-RateLimit-Remaining')
+                if self.verbose and remaining:
+                    print(f"📊 API 剩余请求次数: {remaining}")
+
+                if self._is_rate_limited(response):
+                    if self._is_primary_limited(response):
+                        # 暂停该 Token，下一次会换用其他 Token 或等待其恢复
+                        self.tokens.block(state, response)
+                        print(f"⏳ API 速率限制，重新排队: {url}")
+                    else:
+                        self._throttle(response, url, state)
+                    # 被限流的请求等待后重新排队，不消耗重试次数
+                    if max_requeues is None or requeues < max_requeues:
+                        requeues += 1
+                        continue
+                    print(f"❌ API 速率限制，重新排队 {requeues} 次后放弃: {url}")
+                    self._count('errors')
+                    return None
+
+                if response.status_code == 304 and cached is not None:
+                    self._count('not_modified')
+                    self.cache.touch(cache_key)
+                    return ApiResponse(url, 200, response.headers, cached['data'],
+                                       from_cache=True, link=cached.get('link'))
+
+                # 404 不存在；409 是空仓库的commit列表等确定性的结果，重试也不会变
+                if response.status_code in (404, 409):
+                    return ApiResponse(url, response.status_code, response.headers, None)
+
+                if response.status_code == 403:
+                    print(f"❌ API 权限不足或被限制: {url}")
+                    self._count('errors')
+                    return None
+
+                response.raise_for_status()
+
+                data = self._parse_body(response)
+                if cache_key is not None:
+                    self.cache.set(cache_key, response.headers, data)
+                return ApiResponse(url, response.status_code, response.headers, data)
+
+            except CassetteMiss as e:
+                # 回放时缺少录制的响应：重试也不会命中，直接失败，避免退避等待影响回放耗时
+                print(f"❌ {e}")
+                self._count('errors')
+                return None
+            except (requests.RequestException, ValueError) as e:
+                print(f"⚠️  请求失败 (尝试 {attempt + 1}/{self.max_retries}): {url}")
+                print(f"   错误: {e}")
+
+            attempt += 1
+            if attempt < self.max_retries:
+                wait_time = self.retry_delay * (2 ** (attempt - 1))
+                print(f"⏳ 等待 {wait_time} 秒后重试...")
+                time.sleep(wait_time)
+
+        self._count('errors')
+        return None
+
+    def is_cached(self, url, params=None, headers=None):
+        """请求是否能直接由缓存满足（TTL 内，不消耗配额），用于预估开销"""
+        if self.cache is None:
+            return False
+        key = self.cache.make_key(url, params, (headers or {}).get('Accept'))
+        cached = self.cache.get(key)
+        return cached is not None and self.cache.is_fresh(key, cached)
+
+    def get(self, url, params=None, headers=None):
+        """发送 GET 请求，返回 ApiResponse 或 None"""
+        return self.request('GET', url, params=params, headers=headers)
+
+    def fetch_api(self, url, params=None, headers=None):
+        """发送 GET 请求，成功时返回解析后的 JSON，否则返回 None"""
+        response = self.get(url, params=params, headers=headers)
+        if response is None or not response.ok:
+            return None
+        return response.data
+
+    def paginate(self, url, params=None, headers=None, per_page=100, start_page=1, max_pages=None, strict=False):
+        """
+        获取分页接口的所有页
+
+        先请求第一页并从 Link 头读取最后一页的页码，再并发请求其余页。
+        与逐页请求的语义一致：遇到失败页或空页时停止，短页之后的页丢弃，
+        最多获取 max_pages 页。没有 Link 头但第一页是满页时退回逐页请求。
+
+        strict 为 True 时任何一页请求失败都返回 None，调用方可以区分"没有数据"和"请求失败"
+
+        Returns:
+            按页码顺序排列的每页数据列表；strict 模式下请求失败时返回 None
+        """
+        params = dict(params or {})
+        params['per_page'] = per_page
+
+        def fetch_page(page):
+            return self.fetch_api(url, params=dict(params, page=page), headers=headers)
+
+        first = self.get(url, params=dict(params, page=start_page), headers=headers)
+        if first is None:
+            return None if strict else []
+        if not first.ok or not first.data:
+            return []
+
+        pages = [first.data]
+        end_page = None if max_pages is None else start_page + max_pages - 1
+        last_page = first.last_page
+        if last_page is not None and end_page is not None:
+            last_page = min(last_page, end_page)
+
+        if last_page is not None:
+            results = self.map(fetch_page, range(start_page + 1, last_page + 1))
+            if strict and any(data is None for data in results):
+                return None
+        else:
+            results = []
+            page = start_page + 1
+            while len(pages[-1]) >= per_page and (end_page is None or page <= end_page):
+                data = fetch_page(page)
+                if data is None and strict:
+                    return None
+                if not data:
+                    break
+                pages.append(data)
+                page += 1
+
+        for data in results:
+            if len(pages[-1]) < per_page or not data:
+                break
+            pages.append(data)
+        return pages
+
+    def graphql(self, query, variables=None):
+        """
+        发送 GraphQL 查询（需要 Token）
+
+        Returns:
+            响应 JSON（包含 data，部分失败时还有 errors）；请求失败时返回 None
+        """
+        if not self.tokens.has_tokens:
+            return None
+        response = self.request(
+            'POST',
+            f"{self.api_base}/graphql",
+            json_body={'query': query, 'variables': variables or {}},
+        )
+        if response is None or not response.ok:
+            return None
+        return response.data
+
+    def download(self, url, timeout=None):
+        """下载原始内容（如头像、网页），失败时返回 None"""
+        try:
+            response, _ = self._send('GET', url, timeout=timeout)
+            response.raise_for_status()
+            return response.content
+        except requests.RequestException as e:
+            print(f"  ⚠️ 下载失败 {url}: {e}")
+            self._count('errors')
+            return None
+
+    def download_if_changed(self, url, etag=None, last_modified=None, timeout=None):
+        """
+        条件下载原始内容：带上次的 ETag / Last-Modified，内容未变化时服务器返回 304
+
+        Returns:
+            ApiResponse（data 为响应内容，304 时为 None），失败时返回 None
+        """
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        try:
+            response, _ = self._send('GET', url, headers=headers or None, timeout=timeout)
+            if response.status_code == 304:
+                self._count('not_modified')
+                return ApiResponse(url, 304, response.headers, None, from_cache=True)
+            response.raise_for_status()
+            return ApiResponse(url, response.status_code, response.headers, response.content)
+        except requests.RequestException as e:
+            print(f"  ⚠️ 下载失败 {url}: {e}")
+            self._count('errors')
+            return None
+
+    def refresh_rate_limits(self):
+        """
+        查询每个 Token 的 /rate_limit（该接口不消耗配额），并据此初始化调度器
+
+        Returns:
+            [(token_state, resources)]，查询失败的 Token 不在结果中
+        """
+        results = []
+        for state in self.tokens.states:
+            try:
+                response, _ = self._send('GET', f"{self.api_base}/rate_limit", state=state)
+                if response.status_code != 200:
+                    continue
+                resources = response.json()['resources']
+            except (requests.RequestException, ValueError, KeyError) as e:
+                print(f"⚠️  查询速率限制失败: {e}")
+                continue
+            state.rate_limit.update_from_resources(resources)
+            results.append((state, resources))
+        return results
+
+    # ------------------------------------------------------------------
+    # 并发
+    # ------------------------------------------------------------------
+
+    def map(self, func, items):
+        """
+        在有界线程池中并发执行 func，结果按输入顺序返回
+
+        func 内部的异常会原样抛出，调用方需要自行处理单项失败
+        """
+        items = list(items)
+        if self.max_workers <= 1 or len(items) <= 1:
+            return [func(item) for item in items]
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as executor:
+            return list(executor.map(func, items))
+
+    def imap(self, func, items):
+        """
+        与 map 相同，但以生成器按输入顺序逐个产出结果：
+        调用方可以一边处理已完成的结果，一边等待后面的请求
+        """
+        items = list(items)
+        if self.max_workers <= 1 or len(items) <= 1:
+            for item in items:
+                yield func(item)
+            return
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as executor:
+            for result in executor.map(func, items):
+                yield result
+
+    def fetch_many(self, urls, headers=None):
+        """并发获取多个 URL 的 JSON 数据，结果按输入顺序返回"""
+        return self.map(lambda url: self.fetch_api(url, headers=headers), urls)
+
+    def close(self):
+        self.session.close()
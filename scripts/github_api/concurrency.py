@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+自适应并发控制（AIMD）
+- 响应正常时加性增加：每连续成功 limit 次，并发上限 +1（不超过 max_limit）
+- 遇到二级速率限制（403/429 + Retry-After）时乘性减少：并发上限减半；
+  只有所有 Token 都被限流时才按 Retry-After 暂停所有新请求，否则由其他 Token 继续
+"""
+
+import threading
+import time
+
+
+class AdaptiveLimiter:
+    """可动态调整上限的并发槽位（线程安全）"""
+
+    def __init__(self, max_limit, initial=None, min_limit=1):
+        """
+        Args:
+            max_limit: 并发上限的最大值
+            initial: 初始并发上限，默认为最大值的一半
+            min_limit: 并发上限的最小值
+        """
+        self.max_limit = max(1, int(max_limit))
+        self.min_limit = max(1, min(int(min_limit), self.max_limit))
+        self.limit = max(self.min_limit, min(int(initial or self.max_limit // 2), self.max_limit))
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._halved_until = 0.0
+        self._successes = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        """占用一个槽位，必要时等待暂停结束或其他请求完成"""
+        with self._cond:
+            while True:
+                wait = self.paused_until - time.time()
+                if wait > 0:
+                    self._cond.wait(wait)
+                elif self.in_flight < self.limit:
+                    self.in_flight += 1
+                    return
+                else:
+                    self._cond.wait()
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+    def on_success(self):
+        """一次正常响应：累计满一轮后并发上限 +1"""
+        with self._cond:
+            if self.limit >= self.max_limit:
+                return
+            self._successes += 1
+            if self._successes >= self.limit:
+                self._successes = 0
+                self.limit += 1
+                self._cond.notify_all()
+
+    def on_throttle(self, retry_after, pause=True):
+        """
+        遇到二级速率限制：并发上限减半，pause 为 True 时暂停 retry_after 秒
+
+        Returns:
+            调整后的并发上限
+        """
+        with self._cond:
+            until = time.time() + retry_after
+            # 同一批被限流的并发请求只减半一次
+            if until > self._halved_until + 1:
+                self.limit = max(self.min_limit, self.limit // 2)
+                self._successes = 0
+            self._halved_until = max(self._halved_until, until)
+            if pause:
+                self.paused_until = max(self.paused_until, until)
+            return self.limit
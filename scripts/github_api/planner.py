@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+API 开销预估（--plan 模式）
+各脚本先用少量低成本请求估计每个阶段需要的 API 调用次数，
+再结合当前所有 Token 的剩余配额和探测阶段的实际吞吐量，
+估算整次运行的耗时以及能否在当前速率限制窗口内完成
+"""
+
+import math
+import time
+from datetime import datetime
+
+# 各资源桶的重置窗口（秒）
+WINDOW_SECONDS = {
+    'core': 3600,
+    'graphql': 3600,
+    'search': 60,
+}
+
+
+class CostPlan:
+    """按阶段记录预估的调用次数并输出报告"""
+
+    def __init__(self, client, title):
+        self.client = client
+        self.title = title
+        self.phases = []
+        self._probe_start = time.time()
+        self._probe_requests = client.stats['requests']
+
+    def add(self, phase, calls, resource='core', note=''):
+        """记录一个阶段的预估调用次数"""
+        self.phases.append({
+            'phase': phase,
+            'calls': int(calls),
+            'resource': resource,
+            'note': note,
+        })
+
+    def _throughput(self):
+        """探测阶段的实际吞吐量（次/秒），没有网络请求时返回 None"""
+        requests = self.client.stats['requests'] - self._probe_requests
+        elapsed = time.time() - self._probe_start
+        if requests < 5 or elapsed <= 0:
+            return None
+        return requests / elapsed
+
+    def report(self):
+        """打印每个阶段的预估和配额是否足够"""
+        probe_requests = self.client.stats['requests'] - self._probe_requests
+        throughput = self._throughput()
+        results = self.client.refresh_rate_limits()
+
+        print("\n" + "=" * 60)
+        print(f"🧮 API 开销预估: {self.title}")
+        print("=" * 60)
+        for item in self.phases:
+            note = f"（{item['note']}）" if item['note'] else ''
+            print(f"  - {item['phase']}: {item['calls']} 次 [{item['resource']}]{note}")
+        print(f"  （本次预估已消耗 {probe_requests} 次请求）")
+
+        totals = {}
+        for item in self.phases:
+            totals[item['resource']] = totals.get(item['resource'], 0) + item['calls']
+
+        fits = True
+        total_wait = 0
+        for resource, calls in totals.items():
+            remaining = sum(resources.get(resource, {}).get('remaining', 0) for _, resources in results)
+            limit = sum(resources.get(resource, {}).get('limit', 0) for _, resources in results)
+            resets = [resources[resource]['reset'] for _, resources in results if resource in resources]
+
+            print(f"\n📊 {resource}: 预计 {calls} 次，当前剩余 {remaining}/{limit}")
+            if not results or calls <= remaining:
+                continue
+
+            fits = False
+            if not limit:
+                print(f"  ⚠️  无法获取 {resource} 配额上限")
+                continue
+            # 超出部分需要等待若干个重置窗口
+            windows = math.ceil((calls - remaining) / limit)
+            first_reset = max(0, min(resets) - time.time()) if resets else 0
+            wait = first_reset + (windows - 1) * WINDOW_SECONDS.get(resource, 3600)
+            total_wait = max(total_wait, wait)
+            print(f"  ⚠️  配额不足：还需 {windows} 个重置窗口，首次重置于 "
+                  f"{datetime.fromtimestamp(min(resets)).strftime('%H:%M:%S') if resets else '未知'}")
+
+        total_calls = sum(totals.values())
+        if throughput:
+            duration = total_calls / throughput
+            print(f"\n⏱️  按探测吞吐量 {throughput:.1f} 次/秒，请求耗时约 {duration / 60:.1f} 分钟")
+        else:
+            duration = 0
+            print("\n⏱️  探测请求太少，无法估计吞吐量")
+        if total_wait:
+            print(f"⏳ 另需等待配额重置约 {total_wait / 60:.1f} 分钟，总计约 {(duration + total_wait) / 60:.1f} 分钟")
+
+        print("\n" + ("✅ 当前配额足够完成本次运行" if fits else "⚠️  当前配额不足以在一个窗口内完成本次运行"))
+        print("=" * 60)
+        return fits
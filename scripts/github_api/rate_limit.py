@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+速率限制调度器
+根据每个响应的 X-RateLimit-* 头跟踪 core / search / graphql 等资源桶：
+- 配额充足时不做任何等待
+- 配额紧张时把剩余次数均匀分摊到重置时间之前
+- 配额耗尽时等待到重置时间
+"""
+
+import threading
+import time
+from datetime import datetime
+
+
+class _Bucket:
+    """单个资源桶的配额状态"""
+
+    def __init__(self):
+        self.limit = None
+        self.remaining = None
+        self.used = None
+        self.reset = None  # 重置时间（epoch 秒）
+        self.next_slot = 0.0  # 下一个可用的发送时间
+
+
+class RateLimitScheduler:
+    """按资源桶分别调度的速率限制器（线程安全）"""
+
+    def __init__(self, reserve=0, pace_threshold=0.1):
+        """
+        Args:
+            reserve: 每个资源桶保留不用的配额
+            pace_threshold: 剩余配额低于上限的该比例时开始均匀分摊
+        """
+        self.reserve = reserve
+        self.pace_threshold = pace_threshold
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def resource_for(url):
+        """根据 URL 推断请求消耗的资源桶"""
+        if '/graphql' in url:
+            return 'graphql'
+        if '/search/' in url:
+            return 'search'
+        return 'core'
+
+    def _bucket(self, resource):
+        if resource not in self._buckets:
+            self._buckets[resource] = _Bucket()
+        return self._buckets[resource]
+
+    def _reserve_slot(self, bucket, now):
+        """为一次请求预留发送时间，返回需要等待的秒数（调用方持有锁）"""
+        slot = max(now, bucket.next_slot)
+
+        # 配额未知，或者已经进入新的重置窗口：不限速，等待下一次响应头更新
+        if bucket.remaining is None or bucket.reset is None or slot >= bucket.reset:
+            if bucket.reset is not None and slot >= bucket.reset:
+                bucket.remaining = bucket.limit
+                bucket.reset = None
+            bucket.next_slot = slot
+            return slot - now
+
+        budget = bucket.remaining - self.reserve
+        if budget <= 0:
+            # 配额耗尽：等到重置后再发送，之后按新窗口的满额估计
+            slot = bucket.reset + 1
+            bucket.remaining = bucket.limit
+            bucket.reset = None
+            bucket.next_slot = slot
+            return slot - now
+
+        bucket.remaining -= 1
+        if budget > (bucket.limit or 0) * self.pace_threshold:
+            return 0
+
+        # 配额紧张：把剩余配额均匀分摊到重置时间之前
+        bucket.next_slot = slot + (bucket.reset - slot) / budget
+        return slot - now
+
+    def acquire(self, resource):
+        """发送请求前调用，必要时阻塞等待"""
+        with self._lock:
+            bucket = self._bucket(resource)
+            remaining = bucket.remaining
+            wait = self._reserve_slot(bucket, time.time())
+
+        if wait > 0:
+            if wait >= 1:
+                print(f"⏳ {resource} 配额紧张（剩余 {remaining}），等待 {wait:.1f} 秒...")
+            time.sleep(wait)
+
+    def update(self, headers, resource=None):
+        """根据响应头更新资源桶状态"""
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset = headers.get('X-RateLimit-Reset')
+        if remaining is None or reset is None:
+            return
+
+        resource = headers.get('X-RateLimit-Resource') or resource or 'core'
+        limit = headers.get('X-RateLimit-Limit')
+        used = headers.get('X-RateLimit-Used')
+        self._set(resource, limit, remaining, reset, used)
+
+    def update_from_resources(self, resources):
+        """根据 /rate_limit 接口返回的 resources 字段初始化所有资源桶"""
+        for resource, info in resources.items():
+            self._set(resource, info.get('limit'), info.get('remaining'),
+                      info.get('reset'), info.get('used'))
+
+    def _set(self, resource, limit, remaining, reset, used):
+        remaining = int(remaining)
+        reset = int(reset)
+        with self._lock:
+            bucket = self._bucket(resource)
+            if bucket.reset is None or reset > bucket.reset:
+                bucket.remaining = remaining
+                bucket.reset = reset
+                bucket.next_slot = 0.0
+            elif reset == bucket.reset:
+                # 并发请求的响应可能乱序到达，以更小的剩余次数为准
+                bucket.remaining = min(bucket.remaining, remaining)
+            if limit is not None:
+                bucket.limit = int(limit)
+            if used is not None:
+                bucket.used = int(used)
+
+    def remaining(self, resource):
+        """返回资源桶的剩余配额估计，未知时返回 None"""
+        with self._lock:
+            bucket = self._buckets.get(resource)
+            return bucket.remaining if bucket else None
+
+    def snapshot(self):
+        """返回各资源桶的当前状态，用于日志"""
+        with self._lock:
+            return {
+                resource: {
+                    'limit': bucket.limit,
+                    'remaining': bucket.remaining,
+                    'used': bucket.used,
+                    'reset': datetime.fromtimestamp(bucket.reset).strftime('%H:%M:%S') if bucket.reset else None,
+                }
+                for resource, bucket in self._buckets.items()
+            }
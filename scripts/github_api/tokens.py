@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Token 池
+- 从环境变量（逗号分隔）或文件（每行一个）加载多个 GitHub Token
+- 每个 Token 拥有独立的速率限制调度器
+- 每次请求选择对应资源桶剩余配额最多的 Token
+- 遇到 403/429 速率限制时暂停该 Token，自动切换到其他 Token
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+
+from .rate_limit import RateLimitScheduler
+
+# 配额未知时按 GitHub 认证用户的 core 上限估计
+UNKNOWN_BUDGET = 5000
+
+
+def load_tokens(fallback_envs=('GITHUB_TOKEN',)):
+    """
+    加载 Token 列表（去重并保持顺序）
+
+    来源依次为：
+    - GITHUB_TOKENS：逗号或空白分隔的多个 Token
+    - GITHUB_TOKENS_FILE：Token 文件路径，每行一个，# 开头为注释
+    - fallback_envs：单个 Token 的环境变量（如 GITHUB_TOKEN、GITHUB_KEY）
+    """
+    tokens = []
+    tokens.extend(os.getenv('GITHUB_TOKENS', '').replace(',', ' ').split())
+
+    tokens_file = os.getenv('GITHUB_TOKENS_FILE')
+    if tokens_file and Path(tokens_file).exists():
+        with open(tokens_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    tokens.append(line)
+
+    for env_name in fallback_envs:
+        if os.getenv(env_name):
+            tokens.append(os.getenv(env_name))
+
+    return list(dict.fromkeys(tokens))
+
+
+def mask_token(token):
+    """日志中只显示 Token 的末尾几位"""
+    if not token:
+        return '匿名'
+    return f"***{token[-4:]}"
+
+
+class TokenState:
+    """单个 Token 的状态"""
+
+    def __init__(self, token, reserve=0):
+        self.token = token
+        self.rate_limit = RateLimitScheduler(reserve=reserve)
+        self.requests = 0
+        self.rate_limited = 0
+        self.blocked_until = 0.0  # 被限流后暂停使用直到该时间
+
+    def budget(self, resource):
+        remaining = self.rate_limit.remaining(resource)
+        return UNKNOWN_BUDGET if remaining is None else remaining
+
+
+class TokenPool:
+    """多 Token 池（线程安全）"""
+
+    def __init__(self, tokens=None, reserve=0):
+        if isinstance(tokens, str):
+            tokens = [tokens]
+        tokens = [token for token in (tokens or []) if token]
+        # 没有 Token 时使用一个匿名条目，统一后续逻辑
+        self.states = [TokenState(token, reserve) for token in tokens] or [TokenState(None, reserve)]
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len([state for state in self.states if state.token])
+
+    @property
+    def has_tokens(self):
+        return len(self) > 0
+
+    def _choose(self, resource, now):
+        available = [state for state in self.states if state.blocked_until <= now]
+        if not available:
+            # 全部被暂停时选择最早恢复的 Token
+            return min(self.states, key=lambda state: state.blocked_until)
+        return max(available, key=lambda state: state.budget(resource))
+
+    def acquire(self, resource):
+        """为一次请求选择 Token，必要时等待，返回 TokenState"""
+        with self._lock:
+            state = self._choose(resource, time.time())
+            state.requests += 1
+
+        wait = state.blocked_until - time.time()
+        if wait > 0:
+            print(f"⏳ 所有 Token 均被限流，等待 {wait:.1f} 秒（{mask_token(state.token)}）...")
+            time.sleep(wait)
+        state.rate_limit.acquire(resource)
+        return state
+
+    def block(self, state, response):
+        """
+        Token 被限流时暂停使用：
+        优先使用 Retry-After，其次是配额重置时间，否则暂停 60 秒
+        """
+        now = time.time()
+        retry_after = response.headers.get('Retry-After')
+        reset = response.headers.get('X-RateLimit-Reset')
+        if retry_after and retry_after.isdigit():
+            until = now + int(retry_after)
+        elif response.headers.get('X-RateLimit-Remaining') == '0' and reset:
+            until = int(reset) + 1
+        else:
+            until = now + 60
+
+        with self._lock:
+            state.rate_limited += 1
+            state.blocked_until = max(state.blocked_until, until)
+
+        if len(self.states) > 1:
+            print(f"🔁 Token {mask_token(state.token)} 被限流，切换到其他 Token")
+
+    def all_blocked(self):
+        """是否所有 Token 都处于限流暂停中"""
+        now = time.time()
+        with self._lock:
+            return all(state.blocked_until > now for state in self.states)
+
+    def total_budget(self, resource='core'):
+        """所有 Token 在某个资源桶上的剩余配额之和（未知的按 0 计）"""
+        return sum(state.rate_limit.remaining(resource) or 0 for state in self.states)
+
+    def report(self):
+        """打印每个 Token 的使用情况"""
+        print("🔑 Token 使用情况:")
+        for state in self.states:
+            snapshot = state.rate_limit.snapshot()
+            buckets = ', '.join(
+                f"{resource} 剩余 {info['remaining']}/{info['limit']}"
+                for resource, info in snapshot.items()
+            ) or '无配额信息'
+            print(f"  - {mask_token(state.token)}: 请求 {state.requests} 次, 被限流 {state.rate_limited} 次, {buckets}")
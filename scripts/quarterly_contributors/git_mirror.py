@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+本地 git 镜像读取
+从组织仓库的 bare 镜像（git clone --mirror）中用 git log --numstat 读取
+指定时间范围内每个commit的逐文件新增/删除行数，输出与 get_commit_details 相同的结构，
+使月份范围统计不再需要逐个commit调用 GitHub API
+
+merge commit 与第一个父提交比较（与 REST commit 详情接口一致）；
+git log 默认不输出 merge commit 的 numstat，否则镜像模式永远不会把 merge 计为有效commit
+"""
+
+import re
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+
+# git log 输出中每个commit头部的分隔符
+RECORD_SEPARATOR = '\x1e'
+FIELD_SEPARATOR = '\x1f'
+LOG_FORMAT = (f"{RECORD_SEPARATOR}%H{FIELD_SEPARATOR}%an{FIELD_SEPARATOR}%ae{FIELD_SEPARATOR}%at"
+              f"{FIELD_SEPARATOR}%ct{FIELD_SEPARATOR}%s")
+
+_merge_diff_args = None
+
+
+def merge_diff_args():
+    """
+    让 merge commit 输出相对第一个父提交的 numstat 的 git log 参数
+
+    git 2.31 起使用 --diff-merges=first-parent；更早的版本只能用 -m --first-parent，
+    此时遍历也只沿第一个父提交进行（合并进来的分支上的commit不再单独列出）
+    """
+    global _merge_diff_args
+    if _merge_diff_args is None:
+        output = subprocess.run(['git', 'version'], capture_output=True, text=True).stdout
+        match = re.search(r'(\d+)\.(\d+)', output)
+        version = (int(match.group(1)), int(match.group(2))) if match else (0, 0)
+        _merge_diff_args = ['--diff-merges=first-parent'] if version >= (2, 31) else ['-m', '--first-parent']
+    return _merge_diff_args
+
+
+def list_mirror_repos(mirror_dir):
+    """
+    列出镜像目录中的仓库
+
+    支持 name.git（git clone --mirror 的默认目录名）和普通 name 两种目录
+
+    Returns:
+        [(repo_name, repo_path)]，按仓库名排序
+    """
+    repos = []
+    for path in sorted(Path(mirror_dir).iterdir()):
+        if not path.is_dir():
+            continue
+        if not ((path / 'HEAD').exists() or (path / '.git').exists()):
+            continue
+        name = path.name[:-4] if path.name.endswith('.git') else path.name
+        repos.append((name, path))
+    return repos
+
+
+def _format_date(timestamp):
+    """epoch 秒 → 与 GitHub API 一致的 UTC 时间字符串"""
+    return datetime.fromtimestamp(int(timestamp), tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def get_commits_from_mirror(repo_path, since, until):
+    """
+    读取镜像默认分支上提交时间在 [since, until) 内的commit
+
+    Args:
+        repo_path: 镜像仓库路径
+        since: 开始时间（ISO 格式）
+        until: 结束时间（ISO 格式）
+
+    Returns:
+        commit详情列表，格式与 get_commit_details 相同（author_login 为 None），
+        另有 committed_date（提交者时间，与 --since/--until 过滤使用的时间一致）；
+        merge commit 的 files 为相对第一个父提交的变更
+    """
+    result = subprocess.run(
+        [
+            'git', '-C', str(repo_path), 'log', 'HEAD',
+            f"--since={since}", f"--until={until}",
+            '--numstat', '--no-renames', *merge_diff_args(), f"--format={LOG_FORMAT}",
+        ],
+        capture_output=True,
+        check=True,
+    )
+    output = result.stdout.decode('utf-8', errors='replace')
+
+    commits = []
+    for record in output.split(RECORD_SEPARATOR)[1:]:
+        lines = record.split('\n')
+        sha, author, email, timestamp, committed, subject = lines[0].split(FIELD_SEPARATOR, 5)
+        details = {
+            'sha': sha[:8],
+            'author': author,
+            'author_email': email,
+            'author_login': None,
+            'date': _format_date(timestamp),
+            'committed_date': _format_date(committed),
+            'message': subject[:100],
+            'files': [],
+        }
+        for line in lines[1:]:
+            parts = line.split('\t', 2)
+            if len(parts) != 3:
+                continue
+            # 二进制文件的行数显示为 -
+            additions = int(parts[0]) if parts[0].isdigit() else 0
+            deletions = int(parts[1]) if parts[1].isdigit() else 0
+            details['files'].append({
+                'filename': parts[2],
+                'additions': additions,
+                'deletions': deletions,
+                'changes': additions + deletions,
+            })
+        commits.append(details)
+    return commits
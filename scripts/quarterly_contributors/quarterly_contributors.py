@@ -7,11 +7,14 @@
 - 有效commit定义：至少包含一个文件新增行数 >= 10行
 
 优化特性：
-1. 本地缓存机制 - 避免重复API调用
+1. 本地缓存机制 - 避免重复API调用（SQLite，增量写入）
 2. 增量更新 - 只处理新的commit
 3. 进度显示 - 实时显示处理进度
 4. JSON输出 - 生成前端可用的数据格式
 5. 机器人过滤 - 使用共享的过滤规则
+6. 本地镜像模式 - 从 bare 镜像的 git log --numstat 统计，不调用commit API
+7. 断点续跑 - 每完成一个仓库记录检查点，--resume 从中断处继续
+8. 离线重算 - --recompute 用缓存的commit列表和详情按新阈值重新生成数据文件，不调用API
 """
 
 import os
@@ -20,46 +23,77 @@ import time
 import sys
 import re
 import shutil
+import heapq
+import sqlite3
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
 from collections import defaultdict
-import requests
+from concurrent.futures import ThreadPoolExecutor
 
 # 添加父目录到路径，以便导入共享模块
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from bot_filter import is_bot_account
+from github_api import CostPlan, GitHubClient, ResponseCache, load_tokens, mask_token
+from git_mirror import get_commits_from_mirror, list_mirror_repos
 
 # 配置
 CONFIG = {
-    'GITHUB_TOKEN': os.getenv('GITHUB_TOKEN') or os.getenv('GITHUB_KEY'),
+    # Token 池：GITHUB_TOKENS（逗号分隔）、GITHUB_TOKENS_FILE（每行一个）、GITHUB_TOKEN 和 GITHUB_KEY
+    'GITHUB_TOKENS': load_tokens(fallback_envs=('GITHUB_TOKEN', 'GITHUB_KEY')),
     'ORG_NAME': 'datawhalechina',
     'API_BASE': 'https://api.github.com',
     # 缓存目录
     'CACHE_DIR': Path(__file__).parent.parent.parent / 'docs' / 'public' / 'data' / 'cache',
+    # GitHub API 条件请求缓存目录（ETag / Last-Modified）
+    'HTTP_CACHE_DIR': Path(os.getenv('GITHUB_CACHE_DIR', Path(__file__).parent.parent.parent / '.cache' / 'github_api')),
+    # 本地 bare 镜像目录（git clone --mirror），设置后从镜像统计，不调用commit API
+    'MIRROR_DIR': os.getenv('QUARTERLY_MIRROR_DIR'),
     # 输出目录
     'OUTPUT_DIR': Path(__file__).parent.parent.parent / 'docs' / 'public' / 'data' / 'datawhalechina',
     # 有效commit的阈值（单文件新增行数）
-    'VALID_COMMIT_THRESHOLD': 10,
+    'VALID_COMMIT_THRESHOLD': int(os.getenv('VALID_COMMIT_THRESHOLD', '10')),
     # 贡献者等级阈值
-    'EXCELLENT_THRESHOLD': 10,  # 优秀贡献者
-    'OUTSTANDING_THRESHOLD': 50,  # 卓越贡献者
+    'EXCELLENT_THRESHOLD': int(os.getenv('EXCELLENT_THRESHOLD', '10')),  # 优秀贡献者
+    'OUTSTANDING_THRESHOLD': int(os.getenv('OUTSTANDING_THRESHOLD', '50')),  # 卓越贡献者
+    # 每个贡献者在结果中保留的最近commit数
+    'RECENT_COMMITS_LIMIT': int(os.getenv('RECENT_COMMITS_LIMIT', '10')),
     # API调用控制
     'MAX_RETRIES': 3,
     'RETRY_DELAY': 2,
-    'REQUEST_DELAY': 0.02,  # 请求间隔（秒）
+    'MAX_WORKERS': int(os.getenv('GITHUB_MAX_WORKERS', '8')),  # 最大并发请求数
+    'MAX_REPO_WORKERS': int(os.getenv('QUARTERLY_REPO_WORKERS', '4')),  # 同时处理的仓库数
+    # pushed_at 早于开始时间减去该天数的仓库不可能有范围内的commit，直接跳过
+    'PUSHED_AT_MARGIN_DAYS': int(os.getenv('PUSHED_AT_MARGIN_DAYS', '1')),
+    # 用 GraphQL 批量获取commit总新增行数，总数低于阈值的commit不再请求详情（需要 Token）
+    'USE_GRAPHQL': os.getenv('USE_GRAPHQL', '1') != '0',
+    'GRAPHQL_BATCH_SIZE': int(os.getenv('GRAPHQL_BATCH_SIZE', '100')),  # 每次 GraphQL 查询的commit数
+    # 邮箱搜索不到用户时记为"无法解析"，超过该天数后才重新搜索
+    'EMAIL_NEGATIVE_TTL_DAYS': int(os.getenv('EMAIL_NEGATIVE_TTL_DAYS', '30')),
+    # 从上次中断的检查点继续（命令行 --resume）
+    'RESUME': False,
 }
 
 
-def get_headers():
-    """获取API请求头"""
-    headers = {
-        'Accept': 'application/vnd.github+json',
-        'X-GitHub-Api-Version': '2022-11-28',
-        'User-Agent': 'quarterly-contributors-bot'
-    }
-    if CONFIG['GITHUB_TOKEN']:
-        headers['Authorization'] = f"Bearer {CONFIG['GITHUB_TOKEN']}"
-    return headers
+_client = None
+
+
+def get_client():
+    """获取共享的 GitHub 客户端（首次调用时创建）"""
+    global _client
+    if _client is None:
+        _client = GitHubClient(
+            tokens=CONFIG['GITHUB_TOKENS'],
+            user_agent='quarterly-contributors-bot',
+            accept='application/vnd.github+json',
+            api_base=CONFIG['API_BASE'],
+            max_workers=CONFIG['MAX_WORKERS'],
+            max_retries=CONFIG['MAX_RETRIES'],
+            retry_delay=CONFIG['RETRY_DELAY'],
+            rate_limit_reserve=10,
+            cache=ResponseCache(CONFIG['HTTP_CACHE_DIR']),
+        )
+    return _client
 
 
 def extract_username_from_email(email):
@@ -85,89 +119,108 @@ def search_user_by_email(email):
     """
     通过邮箱搜索GitHub用户
     注意：这会消耗额外的API调用
+
+    Returns:
+        (是否得到了确定的结果, 用户名)；请求失败或跳过搜索时第一项为 False，
+        搜索成功但没有唯一匹配的用户时返回 (True, None)
     """
     if not email or '@' not in email:
-        return None
+        return False, None
 
     # 跳过明显无效的邮箱
     if 'noreply' in email.lower() or 'localhost' in email.lower():
-        return None
+        return False, None
 
     url = f"{CONFIG['API_BASE']}/search/users?q={email}+in:email"
     try:
         data = fetch_api(url)
-        if data and data.get('total_count', 0) == 1:
-            # 只有精确匹配一个用户时才返回
-            return data['items'][0]['login']
     except Exception:
-        pass
+        return False, None
+    if data is None:
+        return False, None
+    if data.get('total_count', 0) == 1:
+        # 只有精确匹配一个用户时才返回
+        return True, data['items'][0]['login']
+    return True, None
 
-    return None
+
+# 同一个邮箱只搜索一次：按邮箱加锁，先拿到锁的线程搜索并写入身份表，
+# 其他线程等到后直接读身份表；不同邮箱之间互不阻塞
+_email_locks = {}
+_email_locks_guard = threading.Lock()
+
+
+def _email_lock(email):
+    with _email_locks_guard:
+        return _email_locks.setdefault(email.lower(), threading.Lock())
+
+
+def resolve_login_by_email(email, cache_manager, search_email=True):
+    """
+    把commit作者邮箱解析为GitHub用户名，依次尝试：
+    身份表（邮箱 → 用户名 / 无法解析）→ noreply 邮箱提取 → 邮箱搜索
+
+    搜索结果（包括搜不到）写入身份表，之后的commit和之后的运行都不再重复搜索；
+    无法解析的记录超过 EMAIL_NEGATIVE_TTL_DAYS 天后才重新搜索
+
+    Returns:
+        用户名，无法解析时返回 None
+    """
+    if not email or '@' not in email:
+        return None
+
+    negative_ttl = CONFIG['EMAIL_NEGATIVE_TTL_DAYS'] * 86400
+    found, login = cache_manager.get_identity(email, negative_ttl)
+    if found:
+        return login
+
+    login = extract_username_from_email(email)
+    if login:
+        print(f"    📧 从邮箱解析用户名: {login}")
+        return login
+
+    if not search_email:
+        return None
+    # 搜索接口限速较严，调度时可能等待较久，只锁住同一个邮箱
+    with _email_lock(email):
+        found, login = cache_manager.get_identity(email, negative_ttl)
+        if found:
+            return login
+        resolved, login = search_user_by_email(email)
+        if resolved:
+            cache_manager.set_identity(email, login)
+    if login:
+        print(f"    🔍 通过邮箱搜索到用户: {login}")
+    return login
 
 
 def check_rate_limit():
-    """检查API速率限制"""
-    url = f"{CONFIG['API_BASE']}/rate_limit"
-    try:
-        response = requests.get(url, headers=get_headers(), timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            core = data['resources']['core']
-            remaining = core['remaining']
-            limit = core['limit']
-            reset_time = datetime.fromtimestamp(core['reset'])
-
-            print(f"📊 API速率限制: {remaining}/{limit} 剩余")
-            print(f"⏰ 重置时间: {reset_time.strftime('%Y-%m-%d %H:%M:%S')}")
-
-            if remaining < 100:
-                print(f"⚠️  警告: API调用次数不足100次，建议等待重置")
-                return False
-            return True
-    except Exception as e:
-        print(f"❌ 检查速率限制失败: {e}")
+    """检查API速率限制（多个 Token 时汇总所有 Token 的剩余配额）"""
+    results = get_client().refresh_rate_limits()
+    if not results:
+        print("❌ 检查速率限制失败")
         return True  # 继续执行
 
+    total_remaining = 0
+    for state, resources in results:
+        core = resources['core']
+        total_remaining += core['remaining']
+        reset_time = datetime.fromtimestamp(core['reset'])
+        print(f"📊 API速率限制 [{mask_token(state.token)}]: {core['remaining']}/{core['limit']} 剩余，"
+              f"重置时间: {reset_time.strftime('%Y-%m-%d %H:%M:%S')}")
 
-def fetch_api(url, retries=None):
-    """发送API请求（带重试和速率限制处理）"""
-    if retries is None:
-        retries = CONFIG['MAX_RETRIES']
-
-    for attempt in range(retries):
-        try:
-            time.sleep(CONFIG['REQUEST_DELAY'])
-            response = requests.get(url, headers=get_headers(), timeout=30)
-
-            # 检查速率限制
-            remaining = response.headers.get('X-RateLimit-Remaining')
-            if remaining and int(remaining) < 10:
-                reset_time = int(response.headers.get('X-RateLimit-Reset', 0))
-                wait_time = max(reset_time - int(time.time()), 0) + 1
-                print(f"⏳ API速率限制接近，等待 {wait_time} 秒...")
-                time.sleep(wait_time)
-                continue
-
-            response.raise_for_status()
-            return response.json()
-
-        except requests.exceptions.HTTPError as e:
-            if response.status_code == 403:
-                print(f"❌ API速率限制或权限问题")
-                return None
-            elif response.status_code == 404:
-                return None
-            print(f"⚠️  HTTP错误 {response.status_code}: {e}")
+    if len(results) > 1:
+        print(f"📊 {len(results)} 个 Token 合计剩余: {total_remaining}")
 
-        except Exception as e:
-            print(f"⚠️  请求失败 (尝试 {attempt + 1}/{retries}): {e}")
+    if total_remaining < 100:
+        print(f"⚠️  警告: API调用次数不足100次，建议等待重置")
+        return False
+    return True
 
-        if attempt < retries - 1:
-            wait_time = CONFIG['RETRY_DELAY'] * (2 ** attempt)
-            print(f"⏳ 等待 {wait_time} 秒后重试...")
-            time.sleep(wait_time)
 
-    return None
+def fetch_api(url):
+    """发送API请求（带重试和速率限制处理）"""
+    return get_client().fetch_api(url)
 
 
 def get_month_date_range(year, start_month, end_month):
@@ -208,52 +261,279 @@ def format_period_label(year, start_month, end_month):
     return f"{year}年{start_month}-{end_month}月"
 
 
+def period_key(year, start_month, end_month):
+    """统计周期的键，与输出文件名的后缀一致，例如 2025_01_03"""
+    return f"{year}_{start_month:02d}_{end_month:02d}"
+
+
+def build_periods(period_list):
+    """
+    [(年份, 开始月份, 结束月份)] → [(周期键, since, until)]
+    """
+    return [(period_key(*period),) + get_month_date_range(*period) for period in period_list]
+
+
+def covering_range(periods):
+    """覆盖所有统计周期的时间范围 (since, until)"""
+    return min(since for _, since, _ in periods), max(until for _, _, until in periods)
+
+
+def periods_of(periods, date):
+    """
+    commit时间所属的统计周期（月份和季度可能同时包含一个commit）
+
+    只有一个统计周期时，时间范围内列出的commit都属于它
+    """
+    if len(periods) == 1:
+        return [periods[0][0]]
+    return [key for key, since, until in periods if date and since <= date < until]
+
+
 class CacheManager:
-    """缓存管理器 - 管理commit详情的本地缓存"""
+    """
+    缓存管理器 - 管理commit详情的本地缓存
+
+    使用 SQLite 按 (仓库, sha) 存储，读取只查询单条记录，写入是增量的 upsert；
+    save() 提交当前事务，中途中断最多丢失最近一次提交之后的记录
+    """
 
     def __init__(self, cache_dir):
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
-        self.cache_file = self.cache_dir / 'commit_details.json'
-        self.cache = self._load_cache()
-
-    def _load_cache(self):
-        """加载缓存"""
-        if self.cache_file.exists():
-            try:
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"⚠️  加载缓存失败: {e}")
-                return {}
-        return {}
+        self.cache_file = self.cache_dir / 'commit_details.sqlite3'
+        # 旧版本的 JSON 缓存文件，首次启动时迁移
+        self.legacy_file = self.cache_dir / 'commit_details.json'
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.cache_file), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS commit_details (
+                repo TEXT NOT NULL,
+                sha TEXT NOT NULL,
+                date TEXT,
+                data TEXT NOT NULL,
+                PRIMARY KEY (repo, sha)
+            )
+        """)
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_commit_details_date ON commit_details (date)')
+        # 身份表：邮箱 → 用户名，login 为 NULL 表示搜索过但无法解析
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS identities (
+                email TEXT PRIMARY KEY,
+                login TEXT,
+                resolved_at REAL NOT NULL
+            )
+        """)
+        # commit列表元数据：离线重算时按时间范围找回列表API返回的commit及其作者；
+        # 每行记录列出它的那次统计中仓库的处理顺序、列表的结束时间和在列表中的位置，
+        # 离线重算按同样的顺序记录commit，与在线统计的输出一致
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS commit_lists (
+                repo TEXT NOT NULL,
+                sha TEXT NOT NULL,
+                committed_date TEXT,
+                author_login TEXT,
+                position INTEGER NOT NULL,
+                repo_rank INTEGER,
+                listed_until TEXT,
+                PRIMARY KEY (repo, sha)
+            )
+        """)
+        self._migrate_commit_lists()
+        self._conn.execute(
+            'CREATE INDEX IF NOT EXISTS idx_commit_lists_date ON commit_lists (committed_date)')
+        # 检查点：一次统计（run_key）中每个已完成仓库的commit数和统计数据
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                run_key TEXT NOT NULL,
+                repo TEXT NOT NULL,
+                commit_count INTEGER NOT NULL,
+                stats TEXT NOT NULL,
+                PRIMARY KEY (run_key, repo)
+            )
+        """)
+        self._conn.commit()
+        self._migrate_legacy_cache()
+
+    def _migrate_commit_lists(self):
+        """旧版本的仓库顺序保存在单独的 repo_order 表中（只保留最近一次统计的顺序），迁移到每行记录"""
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(commit_lists)')}
+        if 'repo_rank' in columns:
+            return
+        self._conn.execute('ALTER TABLE commit_lists ADD COLUMN repo_rank INTEGER')
+        self._conn.execute('ALTER TABLE commit_lists ADD COLUMN listed_until TEXT')
+        has_order = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'repo_order'").fetchone()
+        if has_order:
+            self._conn.execute(
+                'UPDATE commit_lists SET repo_rank = (SELECT rank FROM repo_order r WHERE r.repo = commit_lists.repo)')
+            self._conn.execute('DROP TABLE repo_order')
+        self._conn.commit()
+
+    def _migrate_legacy_cache(self):
+        """把旧的 commit_details.json 一次性导入数据库，完成后重命名为 .migrated"""
+        if not self.legacy_file.exists():
+            return
+        try:
+            with open(self.legacy_file, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+        except Exception as e:
+            print(f"⚠️  加载旧缓存失败: {e}")
+            return
+
+        rows = []
+        for key, data in legacy.items():
+            repo, _, sha = key.partition(':')
+            if data:
+                rows.append((repo, sha, data.get('date'), json.dumps(data, ensure_ascii=False)))
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO commit_details (repo, sha, date, data) VALUES (?, ?, ?, ?)', rows)
+            self._conn.commit()
+        self.legacy_file.rename(self.legacy_file.with_name(self.legacy_file.name + '.migrated'))
+        print(f"📦 已从 {self.legacy_file.name} 迁移 {len(rows)} 条缓存记录")
 
     def get(self, repo, sha):
         """获取缓存的commit详情"""
-        key = f"{repo}:{sha}"
-        return self.cache.get(key)
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT data FROM commit_details WHERE repo = ? AND sha = ?', (repo, sha)).fetchone()
+        return json.loads(row[0]) if row else None
 
     def set(self, repo, sha, data):
-        """设置缓存"""
-        key = f"{repo}:{sha}"
-        self.cache[key] = data
+        """设置缓存（在下一次 save() 时提交）"""
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO commit_details (repo, sha, date, data) VALUES (?, ?, ?, ?)',
+                (repo, sha, data.get('date'), json.dumps(data, ensure_ascii=False)),
+            )
+
+    def set_commit_list(self, repo, rank, until, commits):
+        """
+        记录一个仓库列出的commit（在下一次 save() 时提交）
+
+        Args:
+            repo: 仓库名称
+            rank: 仓库在本次统计中的处理顺序
+            until: 本次列表的结束时间
+            commits: [(sha, 提交者时间, 列表API中的用户名)]，按列表API返回的顺序
+        """
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO commit_lists '
+                '(repo, sha, committed_date, author_login, position, repo_rank, listed_until) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(repo, sha, date, login, position, rank, until)
+                 for position, (sha, date, login) in enumerate(commits)],
+            )
+
+    def listed_commits(self, since, until):
+        """
+        提交者时间在 [since, until) 内的已列出commit，按仓库处理顺序和列表顺序排列
+
+        同一个仓库的commit来自多次统计时，较新的列表（结束时间较晚）在前，
+        与一次列出整个范围时列表API的新旧顺序一致
+
+        Returns:
+            [(仓库名, sha, 列表API中的用户名)]
+        """
+        with self._lock:
+            return self._conn.execute(
+                'SELECT repo, sha, author_login FROM commit_lists '
+                'WHERE committed_date >= ? AND committed_date < ? '
+                'ORDER BY repo_rank, repo, listed_until DESC, position',
+                (since, until),
+            ).fetchall()
+
+    def get_identity(self, email, negative_ttl):
+        """
+        查询邮箱对应的用户名
+
+        Returns:
+            (是否命中, 用户名)；无法解析的记录超过 negative_ttl 秒视为未命中
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT login, resolved_at FROM identities WHERE email = ?', (email.lower(),)).fetchone()
+        if row is None:
+            return False, None
+        login, resolved_at = row
+        if login is None and time.time() - resolved_at >= negative_ttl:
+            return False, None
+        return True, login
+
+    def set_identity(self, email, login):
+        """记录邮箱的解析结果（login 为 None 表示无法解析），立即提交"""
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO identities (email, login, resolved_at) VALUES (?, ?, ?)',
+                (email.lower(), login, time.time()),
+            )
+            self._conn.commit()
+
+    def load_checkpoint(self, run_key):
+        """
+        读取检查点
+
+        Returns:
+            {仓库名: (commit数, {周期键: 该仓库的统计数据})}
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT repo, commit_count, stats FROM checkpoints WHERE run_key = ?', (run_key,)).fetchall()
+        return {
+            repo: (commit_count, {key: deserialize_stats(stats) for key, stats in json.loads(data).items()})
+            for repo, commit_count, data in rows
+        }
+
+    def save_checkpoint(self, run_key, repo, commit_count, period_stats):
+        """记录一个已完成的仓库，立即提交（同时提交之前未保存的commit详情）"""
+        data = json.dumps({key: serialize_stats(stats) for key, stats in period_stats.items()}, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO checkpoints (run_key, repo, commit_count, stats) VALUES (?, ?, ?, ?)',
+                (run_key, repo, commit_count, data),
+            )
+            self._conn.commit()
+
+    def clear_checkpoint(self, run_key):
+        """删除一次统计的检查点"""
+        with self._lock:
+            self._conn.execute('DELETE FROM checkpoints WHERE run_key = ?', (run_key,))
+            self._conn.commit()
 
     def save(self):
-        """保存缓存到文件"""
+        """提交未保存的缓存记录"""
         try:
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self.cache, f, ensure_ascii=False, indent=2)
-            print(f"💾 缓存已保存: {len(self.cache)} 条记录")
+            with self._lock:
+                self._conn.commit()
+            print(f"💾 缓存已保存: {self.size()} 条记录")
         except Exception as e:
             print(f"❌ 保存缓存失败: {e}")
 
     def size(self):
         """返回缓存大小"""
-        return len(self.cache)
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM commit_details').fetchone()[0]
+
+    def count_in_range(self, since, until):
+        """按仓库统计日期在 [since, until) 内的已缓存commit数，用于预估开销"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT repo, COUNT(*) FROM commit_details WHERE date >= ? AND date < ? GROUP BY repo',
+                (since, until),
+            ).fetchall()
+        return defaultdict(int, rows)
+
+    def close(self):
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
 
     def clear(self):
         """清理缓存目录"""
         try:
+            self.close()
             if self.cache_dir.exists():
                 shutil.rmtree(self.cache_dir)
                 print(f"🗑️  缓存目录已清理: {self.cache_dir}")
@@ -265,64 +545,141 @@ def get_org_repos(org_name):
     """获取组织的所有公开仓库"""
     print(f"\n📁 获取组织 {org_name} 的仓库列表...")
     all_repos = []
-    page = 1
-
-    while True:
-        url = f"{CONFIG['API_BASE']}/orgs/{org_name}/repos?per_page=100&page={page}&type=public&sort=updated"
-        repos = fetch_api(url)
 
-        if not repos or len(repos) == 0:
-            break
+    pages = get_client().paginate(
+        f"{CONFIG['API_BASE']}/orgs/{org_name}/repos",
+        params={'type': 'public', 'sort': 'updated'},
+    )
 
+    for page, repos in enumerate(pages, start=1):
         # 过滤fork仓库
         original_repos = [repo for repo in repos if not repo.get('fork', False)]
         all_repos.extend(original_repos)
 
         print(f"  ✓ 第{page}页: {len(original_repos)} 个原创仓库")
 
-        if len(repos) < 100:
-            break
-
-        page += 1
-
     print(f"✅ 总共找到 {len(all_repos)} 个仓库")
     return all_repos
 
 
+def filter_active_repos(repos, since):
+    """
+    活跃度预筛：去掉 pushed_at 早于 since（减去安全余量）的仓库
+
+    最后一次推送在开始时间之前的仓库（包括已归档、长期不活跃的仓库）
+    不可能有该范围内的commit，无需请求commit列表
+
+    Returns:
+        (需要处理的仓库列表, 跳过的仓库数)
+    """
+    cutoff = datetime.strptime(since, '%Y-%m-%dT%H:%M:%SZ') - timedelta(days=CONFIG['PUSHED_AT_MARGIN_DAYS'])
+    cutoff = cutoff.strftime('%Y-%m-%dT%H:%M:%SZ')
+    # pushed_at 缺失时保守处理，仍然请求
+    active = [repo for repo in repos if not repo.get('pushed_at') or repo['pushed_at'] >= cutoff]
+    return active, len(repos) - len(active)
+
+
 def get_commits_in_range(org_name, repo_name, since, until):
-    """获取指定时间范围内的commits"""
-    url = f"{CONFIG['API_BASE']}/repos/{org_name}/{repo_name}/commits"
-    params = {
-        'since': since,
-        'until': until,
-        'per_page': 100
-    }
+    """
+    获取指定时间范围内的commits
 
-    all_commits = []
-    page = 1
+    Returns:
+        commit列表；任何一页请求失败时返回 None（与"没有commit"区分开）
+    """
+    pages = get_client().paginate(
+        f"{CONFIG['API_BASE']}/repos/{org_name}/{repo_name}/commits",
+        params={'since': since, 'until': until},
+        strict=True,
+    )
+    if pages is None:
+        return None
+    return [commit for page in pages for commit in page]
 
-    while True:
-        page_url = f"{url}?since={params['since']}&until={params['until']}&per_page={params['per_page']}&page={page}"
-        commits = fetch_api(page_url)
 
-        if not commits or len(commits) == 0:
-            break
+def build_commit_totals_query(count):
+    """构造批量查询 count 个commit总行数的 GraphQL 语句（sha 通过变量传入）"""
+    params = ', '.join(['$owner: String!', '$name: String!'] + [f"$c{i}: GitObjectID!" for i in range(count)])
+    aliases = '\n'.join(
+        f"    c{i}: object(oid: $c{i}) {{ ... on Commit {{ additions deletions authoredDate }} }}"
+        for i in range(count)
+    )
+    return f"query({params}) {{\n  repository(owner: $owner, name: $name) {{\n{aliases}\n  }}\n}}"
 
-        all_commits.extend(commits)
 
-        if len(commits) < 100:
-            break
+def get_commit_totals(org_name, repo_name, shas):
+    """
+    通过 GraphQL 批量获取commit的总新增/删除行数
 
-        page += 1
+    Returns:
+        {sha: {'additions', 'deletions', 'date'}}，查询失败的commit不在结果中
+    """
+    batch_size = CONFIG['GRAPHQL_BATCH_SIZE']
+    batches = [shas[i:i + batch_size] for i in range(0, len(shas), batch_size)]
+
+    def fetch_batch(batch):
+        variables = {'owner': org_name, 'name': repo_name}
+        variables.update({f"c{i}": sha for i, sha in enumerate(batch)})
+        result = get_client().graphql(build_commit_totals_query(len(batch)), variables)
+        repository = ((result or {}).get('data') or {}).get('repository')
+        if not repository:
+            return {}
+        totals = {}
+        for i, sha in enumerate(batch):
+            node = repository.get(f"c{i}")
+            if node and node.get('additions') is not None:
+                totals[sha] = {
+                    'additions': node['additions'],
+                    'deletions': node['deletions'],
+                    'date': node.get('authoredDate'),
+                }
+        return totals
 
-    return all_commits
+    totals = {}
+    for batch_totals in get_client().map(fetch_batch, batches):
+        totals.update(batch_totals)
+    return totals
+
+
+def prefilter_small_commits(org_name, repo_name, shas, cache_manager):
+    """
+    快速路径：总新增行数低于阈值的commit不可能有单个文件达到阈值，
+    为它们缓存只有总数的摘要，之后不再请求详情
+
+    Returns:
+        被判定为无效的commit数
+    """
+    if not (CONFIG['USE_GRAPHQL'] and CONFIG['GITHUB_TOKENS']):
+        return 0
+
+    pending = [sha for sha in shas if cache_manager.get(repo_name, sha) is None]
+    if not pending:
+        return 0
+
+    totals = get_commit_totals(org_name, repo_name, pending)
+    skipped = 0
+    for sha, total in totals.items():
+        if total['additions'] >= CONFIG['VALID_COMMIT_THRESHOLD']:
+            continue
+        cache_manager.set(repo_name, sha, {
+            'sha': sha[:8],
+            'date': total['date'],
+            'summary_only': True,  # 只有总数，没有作者和文件信息
+            'total_additions': total['additions'],
+            'total_deletions': total['deletions'],
+            'files': [],
+        })
+        skipped += 1
+
+    print(f"    ⚡ GraphQL 总行数预筛: {skipped}/{len(pending)} 个commit低于阈值，跳过详情请求")
+    return skipped
 
 
 def get_commit_details(org_name, repo_name, sha, cache_manager):
     """获取commit的详细信息（带缓存）"""
-    # 先检查缓存
+    # 先检查缓存；只有总数的摘要在阈值调低到其总数以下之前一直有效
     cached = cache_manager.get(repo_name, sha)
-    if cached:
+    if cached and not (cached.get('summary_only') and
+                       cached['total_additions'] >= CONFIG['VALID_COMMIT_THRESHOLD']):
         return cached
 
     # 从API获取
@@ -374,46 +731,157 @@ def is_valid_commit(commit_details):
     return False
 
 
-def process_repository(org_name, repo_name, since, until, cache_manager, stats):
+def push_recent_commit(recent_commits, seq, commit):
+    """
+    把commit放入固定大小的最近commit堆（最多 RECENT_COMMITS_LIMIT 个）
+
+    堆元素为 (日期, -序号, commit)，堆顶是当前保留的最旧的commit；
+    日期相同时先记录的commit优先保留，与对完整列表做稳定排序后取前 N 个的结果一致
+    """
+    limit = CONFIG['RECENT_COMMITS_LIMIT']
+    if limit <= 0:
+        return
+    entry = (commit['date'], -seq, commit)
+    if len(recent_commits) < limit:
+        heapq.heappush(recent_commits, entry)
+    elif entry[:2] > recent_commits[0][:2]:
+        heapq.heapreplace(recent_commits, entry)
+
+
+def record_valid_commit(stats_list, repo_name, details, cache_manager, list_author_login=None, search_email=True):
+    """
+    把一个有效commit记入统计数据
+
+    Args:
+        stats_list: commit所属的各个统计周期的统计数据字典（会被修改）
+        repo_name: 仓库名称
+        details: commit详情（get_commit_details 的返回格式）
+        cache_manager: 缓存管理器（提供邮箱身份表）
+        list_author_login: 列表API中关联到的用户名
+        search_email: 无法解析用户名时是否通过邮箱搜索（消耗 search 配额）
+    """
+    # 获取作者信息 - 多种方式尝试解析GitHub用户名
+    author_login = details.get('author_login')
+    is_verified = True
+
+    # 方式1: 使用列表API中的author login
+    if not author_login and list_author_login:
+        author_login = list_author_login
+
+    # 方式2: 查询身份表、从 noreply 邮箱提取、通过邮箱搜索GitHub用户（消耗额外API）
+    if not author_login:
+        author_login = resolve_login_by_email(details.get('author_email', ''), cache_manager, search_email)
+
+    # 方式3: 无法解析，使用commit作者名，标记为未验证
+    if not author_login:
+        author_login = details.get('author', 'Unknown')
+        is_verified = False
+        print(f"    ⚠️  未能解析GitHub用户名，使用作者名: {author_login}")
+
+    # 检查是否为机器人账户（使用共享的过滤规则）
+    if is_bot_account(author_login):
+        print(f"    🤖 跳过机器人账户: {author_login}")
+        return
+
+    for stats in stats_list:
+        add_commit_to_stats(stats, repo_name, details, author_login, is_verified)
+
+
+def add_commit_to_stats(stats, repo_name, details, author_login, is_verified):
+    """把一个已解析作者的有效commit记入一个统计周期的统计数据"""
+    if author_login not in stats:
+        stats[author_login] = {
+            'username': author_login,
+            'verified': is_verified,
+            'valid_commits': 0,
+            'total_commits': 0,
+            'repos': set(),
+            'recent_commits': []
+        }
+    # 如果之前是未验证的，现在有验证的commit，更新为已验证
+    elif is_verified and not stats[author_login].get('verified'):
+        stats[author_login]['verified'] = True
+
+    # 序号为该贡献者之前的有效commit数，用于日期相同时保持记录顺序
+    push_recent_commit(stats[author_login]['recent_commits'], stats[author_login]['valid_commits'], {
+        'repo': repo_name,
+        'sha': details['sha'],
+        'message': details['message'],
+        'date': details['date'],
+        'files_count': len(details['files']),
+        'total_additions': sum(f['additions'] for f in details['files'])
+    })
+    stats[author_login]['valid_commits'] += 1
+    stats[author_login]['total_commits'] += 1
+    stats[author_login]['repos'].add(repo_name)
+
+
+def process_repository(org_name, repo_name, periods, cache_manager, period_stats, repo_rank=0):
     """
     处理单个仓库的统计
 
+    只列出一次覆盖所有统计周期的commit，再按提交时间分配到各个周期
+
     Args:
         org_name: 组织名称
         repo_name: 仓库名称
-        since: 开始时间
-        until: 结束时间
+        periods: 统计周期 [(周期键, since, until)]
         cache_manager: 缓存管理器
-        stats: 统计数据字典（会被修改）
+        period_stats: {周期键: 统计数据字典}（会被修改）
+        repo_rank: 仓库在组织仓库列表中的顺序（记录到commit列表元数据，供离线重算使用）
 
     Returns:
-        处理的commit数量
+        (处理的commit数量, 是否所有请求都成功)；有请求失败时统计不完整，不应记录检查点
     """
     print(f"\n  📦 处理仓库: {repo_name}")
 
     # 获取时间范围内的commits
+    since, until = covering_range(periods)
     commits = get_commits_in_range(org_name, repo_name, since, until)
+    if commits is None:
+        print("    ❌ 获取commit列表失败")
+        return 0, False
     if not commits:
         print(f"    ℹ️  无commit")
-        return 0
+        return 0, True
 
     print(f"    ✓ 找到 {len(commits)} 个commit")
 
     valid_count = 0
     processed_count = 0
 
-    for i, commit in enumerate(commits):
-        sha = commit['sha']
-        # 从列表API中提取author login（列表API有时能关联到用户，详情API却不行）
+    # 从列表API中提取author login（列表API有时能关联到用户，详情API却不行），
+    # 并提前过滤机器人账户（避免不必要的详情API调用）
+    candidates = []
+    for commit in commits:
         list_author_login = commit.get('author', {}).get('login') if commit.get('author') else None
-
-        # 提前过滤机器人账户（避免不必要的详情API调用）
         if list_author_login and is_bot_account(list_author_login):
             continue
+        # 列表API的 since/until 按提交者时间过滤，分配周期时使用同一个时间
+        committed_date = (commit.get('commit') or {}).get('committer', {}).get('date')
+        candidates.append((commit['sha'], list_author_login, committed_date))
+
+    # 保存列表元数据（包括机器人的commit），离线重算时不需要再列出commit
+    cache_manager.set_commit_list(repo_name, repo_rank, until, [
+        (commit['sha'],
+         (commit.get('commit') or {}).get('committer', {}).get('date'),
+         commit['author'].get('login') if commit.get('author') else None)
+        for commit in commits
+    ])
+
+    # 批量预筛：总新增行数低于阈值的commit直接判定为无效
+    prefilter_small_commits(org_name, repo_name, [sha for sha, _, _ in candidates], cache_manager)
+
+    # 并发获取commit详情（在途请求数由客户端统一限制），之后按commit顺序串行统计
+    all_details = get_client().map(
+        lambda candidate: get_commit_details(org_name, repo_name, candidate[0], cache_manager),
+        candidates,
+    )
 
-        # 获取commit详情
-        details = get_commit_details(org_name, repo_name, sha, cache_manager)
+    failed_count = 0
+    for i, ((sha, list_author_login, committed_date), details) in enumerate(zip(candidates, all_details)):
         if not details:
+            failed_count += 1
             continue
 
         processed_count += 1
@@ -422,72 +890,267 @@ def process_repository(org_name, repo_name, since, until, cache_manager, stats):
         if is_valid_commit(details):
             valid_count += 1
 
-            # 获取作者信息 - 多种方式尝试解析GitHub用户名
-            author_login = details.get('author_login')
-            is_verified = True
-
-            # 方式1: 使用列表API中的author login
-            if not author_login and list_author_login:
-                author_login = list_author_login
-
-            # 方式2: 从邮箱中提取用户名（GitHub noreply格式）
-            if not author_login:
-                author_email = details.get('author_email', '')
-                author_login = extract_username_from_email(author_email)
-                if author_login:
-                    print(f"    📧 从邮箱解析用户名: {author_login}")
-
-            # 方式3: 通过邮箱搜索GitHub用户（消耗额外API）
-            if not author_login:
-                author_email = details.get('author_email', '')
-                if author_email and '@' in author_email:
-                    author_login = search_user_by_email(author_email)
-                    if author_login:
-                        print(f"    🔍 通过邮箱搜索到用户: {author_login}")
-
-            # 方式4: 无法解析，使用commit作者名，标记为未验证
-            if not author_login:
-                author_login = details.get('author', 'Unknown')
-                is_verified = False
-                print(f"    ⚠️  未能解析GitHub用户名，使用作者名: {author_login}")
-
-            # 检查是否为机器人账户（使用共享的过滤规则）
-            if is_bot_account(author_login):
-                print(f"    🤖 跳过机器人账户: {author_login}")
-                continue
-
-            # 记录到统计数据
-            if author_login not in stats:
-                stats[author_login] = {
-                    'username': author_login,
-                    'verified': is_verified,
-                    'valid_commits': 0,
-                    'total_commits': 0,
-                    'repos': set(),
-                    'commits_detail': []
-                }
-            # 如果之前是未验证的，现在有验证的commit，更新为已验证
-            elif is_verified and not stats[author_login].get('verified'):
-                stats[author_login]['verified'] = True
-
-            stats[author_login]['valid_commits'] += 1
-            stats[author_login]['total_commits'] += 1
-            stats[author_login]['repos'].add(repo_name)
-            stats[author_login]['commits_detail'].append({
-                'repo': repo_name,
-                'sha': details['sha'],
-                'message': details['message'],
-                'date': details['date'],
-                'files_count': len(details['files']),
-                'total_additions': sum(f['additions'] for f in details['files'])
-            })
+            keys = periods_of(periods, committed_date or details.get('date'))
+            if keys:
+                stats_list = [period_stats.setdefault(key, {}) for key in keys]
+                record_valid_commit(stats_list, repo_name, details, cache_manager, list_author_login)
 
         # 显示进度
         if (i + 1) % 50 == 0:
-            print(f"    📊 进度: {i + 1}/{len(commits)} commits")
+            print(f"    📊 进度: {i + 1}/{len(candidates)} commits")
 
     print(f"    ✅ 有效commit: {valid_count}/{processed_count}")
-    return processed_count
+    if failed_count:
+        print(f"    ⚠️  {failed_count} 个commit详情获取失败")
+    return processed_count, failed_count == 0
+
+
+def process_mirror_repository(repo_name, repo_path, periods, cache_manager, period_stats):
+    """
+    从本地镜像处理单个仓库的统计（不调用commit列表和详情API）
+
+    Returns:
+        处理的commit数量
+    """
+    print(f"\n  📦 处理镜像仓库: {repo_name}")
+    since, until = covering_range(periods)
+    commits = get_commits_from_mirror(repo_path, since, until)
+    if not commits:
+        print("    ℹ️  无commit")
+        return 0
+
+    valid_count = 0
+    for details in commits:
+        if is_valid_commit(details):
+            valid_count += 1
+            keys = periods_of(periods, details['committed_date'])
+            if keys:
+                stats_list = [period_stats.setdefault(key, {}) for key in keys]
+                # 有 Token 时才通过邮箱搜索用户，保证无网络时也能运行
+                record_valid_commit(stats_list, repo_name, details, cache_manager,
+                                    search_email=bool(CONFIG['GITHUB_TOKENS']))
+
+    print(f"    ✅ 有效commit: {valid_count}/{len(commits)}")
+    return len(commits)
+
+
+def map_repos(func, repos):
+    """同时处理最多 MAX_REPO_WORKERS 个仓库，结果按输入顺序返回"""
+    workers = min(CONFIG['MAX_REPO_WORKERS'], len(repos))
+    if workers <= 1:
+        return [func(repo) for repo in repos]
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        return list(executor.map(func, repos))
+    finally:
+        # 中断时取消还没开始的仓库（已完成的仓库都已记录检查点）
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def merge_stats(stats, repo_stats):
+    """
+    把单个仓库的统计数据合并到总统计中
+
+    按仓库顺序依次合并，得到的结果（包括字典顺序和commit顺序）与串行处理完全相同；
+    仓库内的commit序号加上之前已合并的有效commit数，即为串行处理时的序号
+    """
+    for username, data in repo_stats.items():
+        if username not in stats:
+            stats[username] = {
+                'username': username,
+                'verified': data['verified'],
+                'valid_commits': 0,
+                'total_commits': 0,
+                'repos': set(),
+                'recent_commits': []
+            }
+        # 只要有一个已验证的commit，就标记为已验证
+        elif data['verified'] and not stats[username].get('verified'):
+            stats[username]['verified'] = True
+
+        offset = stats[username]['valid_commits']
+        for _, neg_seq, commit in sorted(data['recent_commits'], key=lambda entry: -entry[1]):
+            push_recent_commit(stats[username]['recent_commits'], offset - neg_seq, commit)
+
+        stats[username]['valid_commits'] += data['valid_commits']
+        stats[username]['total_commits'] += data['total_commits']
+        stats[username]['repos'].update(data['repos'])
+
+
+def serialize_stats(stats):
+    """把统计数据转换为可 JSON 序列化的格式（repos 集合转为排序后的列表，最近commit堆中的元组转为列表）"""
+    return {
+        username: dict(data, repos=sorted(data['repos']))
+        for username, data in stats.items()
+    }
+
+
+def deserialize_stats(data):
+    """serialize_stats 的逆过程"""
+    return {
+        username: dict(
+            item,
+            repos=set(item['repos']),
+            recent_commits=[tuple(entry) for entry in item['recent_commits']],
+        )
+        for username, item in data.items()
+    }
+
+
+def checkpoint_key(periods):
+    """检查点的键：数据来源 + 组织 + 统计周期"""
+    source = 'mirror' if CONFIG['MIRROR_DIR'] else 'api'
+    return f"{source}:{CONFIG['ORG_NAME']}:{','.join(key for key, _, _ in periods)}"
+
+
+def load_checkpoint(cache_manager, run_key):
+    """
+    --resume 时读取已完成仓库的检查点，否则清除旧的检查点重新开始
+
+    Returns:
+        {仓库名: (commit数, {周期键: 该仓库的统计数据})}
+    """
+    if not CONFIG['RESUME']:
+        cache_manager.clear_checkpoint(run_key)
+        return {}
+    done = cache_manager.load_checkpoint(run_key)
+    if done:
+        print(f"♻️  从检查点继续: 已完成 {len(done)} 个仓库")
+    else:
+        print("ℹ️  没有可用的检查点，从头开始统计")
+    return done
+
+
+def collect_stats_from_api(periods):
+    """
+    通过 GitHub API 统计所有仓库
+
+    Args:
+        periods: 统计周期 [(周期键, since, until)]
+
+    Returns:
+        ({周期键: stats}, 仓库数, commit数)；无法开始统计时返回 None
+    """
+    # 检查API速率限制
+    if not check_rate_limit():
+        print("⚠️  API调用次数不足，建议稍后再试")
+        return None
+
+    # 初始化缓存管理器
+    cache_manager = CacheManager(CONFIG['CACHE_DIR'])
+    print(f"📦 缓存已加载: {cache_manager.size()} 条记录")
+
+    # 获取组织仓库
+    repos = get_org_repos(CONFIG['ORG_NAME'])
+    if not repos:
+        print("❌ 未找到任何仓库")
+        return None
+
+    # 按未经活跃度预筛的仓库顺序记录，不同时间范围的统计之间顺序可比
+    repo_ranks = {repo['name']: rank for rank, repo in enumerate(repos)}
+
+    since, _ = covering_range(periods)
+    repos, skipped = filter_active_repos(repos, since)
+    if skipped:
+        print(f"⏭️  活跃度预筛: 跳过 {skipped} 个在 {since} 之前就没有推送的仓库，节省至少 {skipped} 次commit列表请求")
+
+    run_key = checkpoint_key(periods)
+    done = load_checkpoint(cache_manager, run_key)
+
+    completed = [0]
+    completed_lock = threading.Lock()
+
+    def process(indexed_repo):
+        """处理单个仓库，返回 (commit数, {周期键: 该仓库的统计数据})"""
+        i, repo = indexed_repo
+        repo_name = repo['name']
+        if repo_name in done:
+            print(f"\n[{i+1}/{len(repos)}] ♻️  检查点中已完成: {repo_name}")
+            return done[repo_name]
+        print(f"\n[{i+1}/{len(repos)}] 处理仓库: {repo_name}")
+        repo_stats = {}
+        try:
+            commit_count, complete = process_repository(
+                CONFIG['ORG_NAME'],
+                repo_name,
+                periods,
+                cache_manager,
+                repo_stats,
+                repo_rank=repo_ranks[repo_name],
+            )
+        except Exception as e:
+            # 已统计的commit仍计入本次结果（commit数不计），但不记录检查点，--resume 时重新处理
+            print(f"  ❌ 处理失败: {e}")
+            return 0, repo_stats
+
+        # 有请求失败的仓库仍计入本次结果，但不记录检查点，--resume 时重新处理
+        if complete:
+            cache_manager.save_checkpoint(run_key, repo_name, commit_count, repo_stats)
+
+        # 每处理10个仓库保存一次缓存
+        with completed_lock:
+            completed[0] += 1
+            should_save = completed[0] % 10 == 0
+        if should_save:
+            cache_manager.save()
+        return commit_count, repo_stats
+
+    # 多个仓库同时处理，结果按仓库顺序合并，与串行处理的输出一致
+    stats_by_period = {key: {} for key, _, _ in periods}
+    total_commits = 0
+    for commit_count, repo_stats in map_repos(process, list(enumerate(repos))):
+        total_commits += commit_count
+        for key, stats in repo_stats.items():
+            merge_stats(stats_by_period[key], stats)
+
+    # 保存最终缓存
+    cache_manager.save()
+    cache_manager.close()
+    return stats_by_period, len(repos), total_commits
+
+
+def collect_stats_from_mirrors(mirror_dir, periods):
+    """
+    从本地 bare 镜像目录统计所有仓库（git log --numstat）
+
+    Returns:
+        ({周期键: stats}, 仓库数, commit数)；无法开始统计时返回 None
+    """
+    repos = list_mirror_repos(mirror_dir)
+    if not repos:
+        print(f"❌ 镜像目录中没有仓库: {mirror_dir}")
+        return None
+    print(f"🪞 本地镜像模式: {mirror_dir}（{len(repos)} 个仓库）")
+
+    # 镜像模式只使用其中的邮箱身份表和检查点
+    cache_manager = CacheManager(CONFIG['CACHE_DIR'])
+    run_key = checkpoint_key(periods)
+    done = load_checkpoint(cache_manager, run_key)
+
+    def process(indexed_repo):
+        """处理单个镜像仓库，返回 (commit数, {周期键: 该仓库的统计数据})"""
+        i, (repo_name, repo_path) = indexed_repo
+        if repo_name in done:
+            print(f"\n[{i+1}/{len(repos)}] ♻️  检查点中已完成: {repo_name}")
+            return done[repo_name]
+        print(f"\n[{i+1}/{len(repos)}] 处理仓库: {repo_name}")
+        repo_stats = {}
+        try:
+            commit_count = process_mirror_repository(repo_name, repo_path, periods, cache_manager, repo_stats)
+        except Exception as e:
+            print(f"  ❌ 处理失败: {e}")
+            return 0, repo_stats
+        cache_manager.save_checkpoint(run_key, repo_name, commit_count, repo_stats)
+        return commit_count, repo_stats
+
+    stats_by_period = {key: {} for key, _, _ in periods}
+    total_commits = 0
+    for commit_count, repo_stats in map_repos(process, list(enumerate(repos))):
+        total_commits += commit_count
+        for key, stats in repo_stats.items():
+            merge_stats(stats_by_period[key], stats)
+    cache_manager.close()
+    return stats_by_period, len(repos), total_commits
 
 
 def classify_contributors(stats):
@@ -515,11 +1178,8 @@ def classify_contributors(stats):
             'total_commits': data['total_commits'],
             'repos_count': len(data['repos']),
             'repos': sorted(list(data['repos'])),
-            'recent_commits': sorted(
-                data['commits_detail'],
-                key=lambda x: x['date'],
-                reverse=True
-            )[:10]  # 只保留最近10个commit
+            # 最近commit堆按 (日期, -序号) 降序排列
+            'recent_commits': [commit for _, _, commit in sorted(data['recent_commits'], reverse=True)]
         }
 
         if valid_commits >= CONFIG['OUTSTANDING_THRESHOLD']:
@@ -541,51 +1201,121 @@ def classify_contributors(stats):
     }
 
 
-def update_monthly_index(output_dir):
-    """重建前端可用的月份范围索引"""
+INDEX_FILENAME = 'monthly_contributors_index.json'
+
+
+def read_meta(file_path):
+    """
+    只读取数据文件开头的 meta 块，不解析整个文件
+
+    save_results 写出的文件中 meta 是第一个键，按块读取直到 meta 对象完整即可
+
+    Returns:
+        meta 字典，找不到时返回 None
+    """
+    decoder = json.JSONDecoder()
+    text = ''
+    with open(file_path, 'r', encoding='utf-8') as f:
+        while True:
+            chunk = f.read(8192)
+            text += chunk
+            match = re.search(r'"meta"\s*:\s*', text)
+            if match:
+                try:
+                    meta, _ = decoder.raw_decode(text, match.end())
+                    return meta if isinstance(meta, dict) else None
+                except ValueError:
+                    # meta 块还没读完整
+                    pass
+            if not chunk:
+                return None
+
+
+def build_index_item(meta, filename):
+    """由数据文件的 meta 生成一条索引记录，缺少月份范围时返回 None"""
+    year = meta.get('year')
+    start_month = meta.get('start_month')
+    end_month = meta.get('end_month')
+    if not year or not start_month or not end_month:
+        return None
+
+    return {
+        'year': year,
+        'start_month': start_month,
+        'end_month': end_month,
+        'period_label': meta.get('period_label') or format_period_label(year, start_month, end_month),
+        'filename': filename,
+        'generated_at': meta.get('generated_at'),
+        'total_contributors': meta.get('total_contributors', 0),
+        'outstanding_count': meta.get('outstanding_count', 0),
+        'excellent_count': meta.get('excellent_count', 0),
+        'active_count': meta.get('active_count', 0),
+    }
+
+
+def write_monthly_index(output_dir, index_items):
+    """排序并写入月份范围索引"""
+    index_items.sort(
+        key=lambda item: (item['year'], item['end_month'], item['start_month']),
+        reverse=True
+    )
+
+    index_file = Path(output_dir) / INDEX_FILENAME
+    with open(index_file, 'w', encoding='utf-8') as f:
+        json.dump(index_items, f, ensure_ascii=False, indent=2)
+    return index_file
+
+
+def rebuild_monthly_index(output_dir):
+    """修复模式：扫描所有数据文件重建索引（每个文件只读取 meta 块）"""
     output_dir = Path(output_dir)
     index_items = []
 
-    for file_path in output_dir.glob('monthly_contributors_*.json'):
-        if file_path.name == 'monthly_contributors_index.json':
+    for file_path in sorted(output_dir.glob('monthly_contributors_*.json')):
+        if file_path.name == INDEX_FILENAME:
             continue
 
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            meta = read_meta(file_path)
         except Exception as e:
             print(f"⚠️  跳过无法读取的数据文件 {file_path.name}: {e}")
             continue
 
-        meta = data.get('meta', {})
-        year = meta.get('year')
-        start_month = meta.get('start_month')
-        end_month = meta.get('end_month')
-        if not year or not start_month or not end_month:
+        item = build_index_item(meta or {}, file_path.name)
+        if item is None:
             print(f"⚠️  跳过缺少月份范围元数据的文件: {file_path.name}")
             continue
+        index_items.append(item)
 
-        index_items.append({
-            'year': year,
-            'start_month': start_month,
-            'end_month': end_month,
-            'period_label': meta.get('period_label') or format_period_label(year, start_month, end_month),
-            'filename': file_path.name,
-            'generated_at': meta.get('generated_at'),
-            'total_contributors': meta.get('total_contributors', 0),
-            'outstanding_count': meta.get('outstanding_count', 0),
-            'excellent_count': meta.get('excellent_count', 0),
-            'active_count': meta.get('active_count', 0),
-        })
+    index_file = write_monthly_index(output_dir, index_items)
+    print(f"🧭 月份范围索引已重建: {index_file}（{len(index_items)} 个数据文件）")
+    return index_file
 
-    index_items.sort(
-        key=lambda item: (item['year'], item['end_month'], item['start_month']),
-        reverse=True
-    )
 
-    index_file = output_dir / 'monthly_contributors_index.json'
-    with open(index_file, 'w', encoding='utf-8') as f:
-        json.dump(index_items, f, ensure_ascii=False, indent=2)
+def update_monthly_index(output_dir, meta, filename):
+    """
+    用刚写入的数据文件的 meta 增量更新索引，不读取其他数据文件
+
+    索引不存在或损坏时退回修复模式重建
+    """
+    output_dir = Path(output_dir)
+    index_file = output_dir / INDEX_FILENAME
+    try:
+        with open(index_file, 'r', encoding='utf-8') as f:
+            index_items = json.load(f)
+        if not isinstance(index_items, list):
+            raise ValueError('索引格式错误')
+    except FileNotFoundError:
+        return rebuild_monthly_index(output_dir)
+    except Exception as e:
+        print(f"⚠️  索引无法读取，重建索引: {e}")
+        return rebuild_monthly_index(output_dir)
+
+    index_items = [item for item in index_items if item.get('filename') != filename]
+    item = build_index_item(meta, filename)
+    if item is not None:
+        index_items.append(item)
+    write_monthly_index(output_dir, index_items)
 
     print(f"🧭 月份范围索引已更新: {index_file}")
     return index_file
@@ -626,7 +1356,7 @@ def save_results(year, start_month, end_month, classified, stats, output_dir):
     with open(output_file, 'w', encoding='utf-8') as f:
         json.dump(result, f, ensure_ascii=False, indent=2)
 
-    update_monthly_index(output_dir)
+    update_monthly_index(output_dir, result['meta'], filename)
 
     print(f"\n💾 结果已保存到: {output_file}")
     return output_file
@@ -661,87 +1391,259 @@ def main(year, start_month, end_month):
         start_month: 开始月份 (1-12)
         end_month: 结束月份 (1-12)
     """
+    output_files = run_periods([(year, start_month, end_month)])
+    return output_files[0] if output_files else None
+
+
+def run_periods(period_list):
+    """
+    统计一个或多个月份范围的贡献者
+
+    所有月份范围共用一次遍历：每个仓库只列出一次覆盖全部范围的commit，
+    按提交时间分配到各个范围后分别分级、保存
+
+    Args:
+        period_list: [(年份, 开始月份, 结束月份)]
+
+    Returns:
+        输出文件路径列表
+    """
+    labels = [format_period_label(*period) for period in period_list]
     print("="*60)
-    print(f"🚀 开始统计 {format_period_label(year, start_month, end_month)} 贡献者")
+    if len(period_list) == 1:
+        print(f"🚀 开始统计 {labels[0]} 贡献者")
+    else:
+        print(f"🚀 批量统计 {len(period_list)} 个月份范围: {', '.join(labels)}")
     print("="*60)
 
-    # 检查API速率限制
-    if not check_rate_limit():
-        print("⚠️  API调用次数不足，建议稍后再试")
-        return
+    # 获取月份范围
+    periods = build_periods(period_list)
+    since, until = covering_range(periods)
+    print(f"📅 统计时间范围: {since} 至 {until}")
 
-    # 初始化缓存管理器
+    start_time = time.time()
+    if CONFIG['MIRROR_DIR']:
+        result = collect_stats_from_mirrors(CONFIG['MIRROR_DIR'], periods)
+    else:
+        result = collect_stats_from_api(periods)
+    if result is None:
+        return []
+    stats_by_period, repo_count, total_commits = result
+
+    output_files = []
+    for (year, start_month, end_month), label, (key, _, _) in zip(period_list, labels, periods):
+        stats = stats_by_period[key]
+
+        # 对贡献者进行分级
+        print(f"\n📊 正在分级贡献者: {label}")
+        classified = classify_contributors(stats)
+
+        # 打印摘要
+        print_summary(classified)
+
+        # 保存结果
+        output_files.append(save_results(
+            year,
+            start_month,
+            end_month,
+            classified,
+            stats,
+            CONFIG['OUTPUT_DIR']
+        ))
+        print(f"📊 {label} 贡献者: {len(stats)} 人")
+
+    # 结果已保存，清除本次统计的检查点
     cache_manager = CacheManager(CONFIG['CACHE_DIR'])
-    print(f"📦 缓存已加载: {cache_manager.size()} 条记录")
+    cache_manager.clear_checkpoint(checkpoint_key(periods))
+    cache_manager.close()
 
-    # 获取月份范围
+    # 显示执行统计
+    elapsed_time = time.time() - start_time
+    print(f"\n⏱️  总耗时: {elapsed_time:.1f} 秒")
+    print(f"📊 处理仓库: {repo_count} 个")
+    print(f"📊 总commit数: {total_commits}")
+    if len(period_list) > 1:
+        print(f"📊 输出文件: {len(output_files)} 个")
+    if not CONFIG['MIRROR_DIR']:
+        print(f"📊 API请求: {get_client().stats['requests']} 次（缓存命中: TTL 内 {get_client().stats['cache_hits']} 次, 304 {get_client().stats['not_modified']} 次）")
+        print(f"📊 二级速率限制: {get_client().stats['throttled']} 次（最终并发 {get_client().limiter.limit}）")
+        get_client().tokens.report()
+
+    print("\n✅ 统计完成！")
+    return output_files
+
+
+def parse_month_span(spec):
+    """
+    解析 "2025-01..2025-12"（或单个月份 "2025-03"）为按时间排序的 [(年份, 月份)]
+
+    Raises:
+        ValueError: 格式错误或开始月份晚于结束月份
+    """
+    start, _, end = spec.partition('..')
+    start_year, start_month = (int(part) for part in start.split('-'))
+    end_year, end_month = (int(part) for part in (end or start).split('-'))
+    if not (1 <= start_month <= 12 and 1 <= end_month <= 12):
+        raise ValueError("月份必须是 1-12 之间的数字")
+    if (start_year, start_month) > (end_year, end_month):
+        raise ValueError("开始月份不能晚于结束月份")
+
+    months = []
+    year, month = start_year, start_month
+    while (year, month) <= (end_year, end_month):
+        months.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def expand_periods(months, also_quarters=False):
+    """
+    每个月份一个统计周期；also_quarters 时再加上被完整覆盖的自然季度
+
+    Returns:
+        [(年份, 开始月份, 结束月份)]
+    """
+    period_list = [(year, month, month) for year, month in months]
+    if also_quarters:
+        covered = set(months)
+        for year in sorted({year for year, _ in months}):
+            for start_month in (1, 4, 7, 10):
+                if all((year, month) in covered for month in range(start_month, start_month + 3)):
+                    period_list.append((year, start_month, start_month + 2))
+    return period_list
+
+
+def plan(year, start_month, end_month):
+    """
+    预估统计指定月份范围需要的API调用次数和耗时，不写入任何结果
+
+    每个仓库只请求一次 per_page=1 的commit列表，从 Link 头得到commit总数；
+    commit详情的开销扣除本地缓存中已有的同时间范围commit
+    """
+    print("="*60)
+    print(f"🧮 预估 {format_period_label(year, start_month, end_month)} 贡献者统计的API开销")
+    print("="*60)
+
+    if CONFIG['MIRROR_DIR']:
+        print("🪞 本地镜像模式不调用commit API，只有无法关联账号的commit可能消耗 search 配额")
+        return
+
+    cost_plan = CostPlan(get_client(), format_period_label(year, start_month, end_month))
+    cache_manager = CacheManager(CONFIG['CACHE_DIR'])
     since, until = get_month_date_range(year, start_month, end_month)
-    print(f"📅 统计时间范围: {since} 至 {until}")
 
-    # 获取组织仓库
     repos = get_org_repos(CONFIG['ORG_NAME'])
+    cost_plan.add("组织仓库列表", -(-len(repos) // 100) or 1)
     if not repos:
-        print("❌ 未找到任何仓库")
+        cost_plan.report()
         return
 
-    # 统计数据
-    stats = {}
-    total_commits = 0
-    start_time = time.time()
+    repos, skipped = filter_active_repos(repos, since)
+    if skipped:
+        print(f"⏭️  活跃度预筛将跳过 {skipped} 个仓库")
+
+    def count_commits(repo):
+        """commit总数：per_page=1 时最后一页的页码"""
+        response = get_client().get(
+            f"{CONFIG['API_BASE']}/repos/{CONFIG['ORG_NAME']}/{repo['name']}/commits",
+            params={'since': since, 'until': until, 'per_page': 1},
+        )
+        if response is None or not response.ok:
+            return 0
+        return response.last_page or len(response.data or [])
+
+    print(f"\n🔍 探测 {len(repos)} 个仓库的commit数...")
+    commit_counts = get_client().map(count_commits, repos)
+    cached_counts = cache_manager.count_in_range(since, until)
+    cache_manager.close()
+
+    total_commits = sum(commit_counts)
+    list_calls = sum(max(1, -(-count // 100)) for count in commit_counts)
+    detail_calls = sum(
+        max(0, count - cached_counts.get(repo['name'], 0))
+        for repo, count in zip(repos, commit_counts)
+    )
+    cached_total = total_commits - detail_calls
+
+    cost_plan.add("commit列表", list_calls, note=f"{total_commits} 个commit")
+    detail_note = f"缓存命中约 {cached_total}/{total_commits}" if total_commits else ''
+    if CONFIG['USE_GRAPHQL'] and CONFIG['GITHUB_TOKENS']:
+        graphql_calls = sum(
+            -(-max(0, count - cached_counts.get(repo['name'], 0)) // CONFIG['GRAPHQL_BATCH_SIZE'])
+            for repo, count in zip(repos, commit_counts)
+        )
+        cost_plan.add("GraphQL 总行数预筛", graphql_calls, resource='graphql')
+        detail_note += "，低于阈值的commit会被预筛跳过，实际更少"
+    cost_plan.add("commit详情（上限）", detail_calls, note=detail_note)
+    cost_plan.add("邮箱搜索用户", 0, resource='search', note="仅无法关联账号的commit，无法预估")
+    cost_plan.report()
+
+
+def recompute(year, start_month, end_month):
+    """
+    离线重算：用本地缓存的commit列表元数据和commit详情，按当前阈值重新生成月份范围数据文件
 
-    # 处理每个仓库
-    for i, repo in enumerate(repos):
-        repo_name = repo['name']
-        print(f"\n[{i+1}/{len(repos)}] 处理仓库: {repo_name}")
+    不调用任何API（包括邮箱搜索，作者只从身份表和 noreply 邮箱解析）。
+    只有总行数摘要的commit在新阈值下无法判断时计为无效并给出提示
 
-        try:
-            commit_count = process_repository(
-                CONFIG['ORG_NAME'],
-                repo_name,
-                since,
-                until,
-                cache_manager,
-                stats
-            )
-            total_commits += commit_count
+    Returns:
+        输出文件路径，缓存中没有该范围的数据时返回 None
+    """
+    label = format_period_label(year, start_month, end_month)
+    print("="*60)
+    print(f"♻️  离线重算 {label} 贡献者（有效commit阈值 {CONFIG['VALID_COMMIT_THRESHOLD']} 行）")
+    print("="*60)
 
-            # 每处理10个仓库保存一次缓存
-            if (i + 1) % 10 == 0:
-                cache_manager.save()
+    since, until = get_month_date_range(year, start_month, end_month)
+    cache_manager = CacheManager(CONFIG['CACHE_DIR'])
+    rows = cache_manager.listed_commits(since, until)
+    if not rows:
+        print(f"❌ 缓存中没有 {label} 的commit列表，请先在线统计一次")
+        cache_manager.close()
+        return None
 
-        except Exception as e:
-            print(f"  ❌ 处理失败: {e}")
+    stats = {}
+    missing = 0
+    summary_only = 0
+    for repo_name, sha, list_author_login in rows:
+        if list_author_login and is_bot_account(list_author_login):
             continue
+        details = cache_manager.get(repo_name, sha)
+        if details is None:
+            missing += 1
+            continue
+        if details.get('summary_only') and details['total_additions'] >= CONFIG['VALID_COMMIT_THRESHOLD']:
+            summary_only += 1
+            continue
+        if is_valid_commit(details):
+            record_valid_commit([stats], repo_name, details, cache_manager, list_author_login, search_email=False)
+    cache_manager.close()
 
-    # 保存最终缓存
-    cache_manager.save()
+    print(f"\n📊 缓存中的commit: {len(rows)} 个")
+    if missing:
+        print(f"⚠️  {missing} 个commit没有缓存的详情（在线统计时获取失败），按无效处理")
+    if summary_only:
+        print(f"⚠️  {summary_only} 个commit只有总行数摘要，新阈值下需要逐文件详情才能判断，按无效处理；"
+              f"如需精确结果请在线重新统计")
 
-    # 对贡献者进行分级
-    print("\n📊 正在分级贡献者...")
     classified = classify_contributors(stats)
-
-    # 打印摘要
     print_summary(classified)
+    output_file = save_results(year, start_month, end_month, classified, stats, CONFIG['OUTPUT_DIR'])
+    print("\n✅ 离线重算完成！")
+    return output_file
 
-    # 保存结果
-    output_file = save_results(
-        year,
-        start_month,
-        end_month,
-        classified,
-        stats,
-        CONFIG['OUTPUT_DIR']
-    )
-
-    # 显示执行统计
-    elapsed_time = time.time() - start_time
-    print(f"\n⏱️  总耗时: {elapsed_time:.1f} 秒")
-    print(f"📊 处理仓库: {len(repos)} 个")
-    print(f"📊 总commit数: {total_commits}")
-    print(f"📊 总贡献者: {len(stats)} 人")
 
-    print("\n✅ 统计完成！")
-    return output_file
+def recompute_all():
+    """离线重算输出目录中已有的所有月份范围数据文件"""
+    output_dir = Path(CONFIG['OUTPUT_DIR'])
+    for file_path in sorted(output_dir.glob('monthly_contributors_*.json')):
+        if file_path.name == INDEX_FILENAME:
+            continue
+        meta = read_meta(file_path) or {}
+        if not (meta.get('year') and meta.get('start_month') and meta.get('end_month')):
+            print(f"⚠️  跳过缺少月份范围元数据的文件: {file_path.name}")
+            continue
+        recompute(meta['year'], meta['start_month'], meta['end_month'])
 
 
 def get_previous_month():
@@ -769,24 +1671,92 @@ if __name__ == '__main__':
         print("  python quarterly_contributors.py --last      # 统计上个月")
         print("  python quarterly_contributors.py --current   # 统计当前月")
         print("  python quarterly_contributors.py <年份> <开始月份> <结束月份>  # 统计指定月份范围")
+        print("  python quarterly_contributors.py --months <开始年-月>..<结束年-月> [--also-quarters]  # 一次遍历生成每个月（和完整季度）的数据")
+        print("  python quarterly_contributors.py --rebuild-index  # 扫描所有数据文件的 meta 重建月份范围索引")
+        print("  以上任一命令加 --plan                              # 只预估API开销和耗时，不执行统计")
+        print("  以上任一命令加 --mirror-dir <目录>                 # 从本地 bare 镜像统计，不调用commit API")
+        print("  以上任一命令加 --resume                            # 从上次中断时的检查点继续")
+        print("  以上任一命令加 --recompute                         # 用本地缓存按当前阈值离线重算，不调用API")
+        print("  python quarterly_contributors.py --recompute       # 离线重算所有已有的数据文件")
         print("")
         print("示例:")
         print("  python quarterly_contributors.py --last")
         print("  python quarterly_contributors.py 2025 10 12")
         print("  python quarterly_contributors.py 2026 1 4")
+        print("  python quarterly_contributors.py 2026 1 4 --plan")
+        print("  python quarterly_contributors.py 2026 1 4 --mirror-dir ./mirrors")
+        print("  python quarterly_contributors.py 2026 1 4 --resume")
+        print("  python quarterly_contributors.py --months 2025-01..2025-12 --also-quarters")
+        sys.exit(0)
+
+    # --rebuild-index：修复月份范围索引
+    if sys.argv[1] == '--rebuild-index':
+        rebuild_monthly_index(CONFIG['OUTPUT_DIR'])
         sys.exit(0)
 
+    # --mirror-dir <目录>：本地镜像模式
+    if '--mirror-dir' in sys.argv:
+        index = sys.argv.index('--mirror-dir')
+        if index + 1 >= len(sys.argv):
+            print("❌ --mirror-dir 需要指定镜像目录")
+            sys.exit(1)
+        CONFIG['MIRROR_DIR'] = sys.argv[index + 1]
+        del sys.argv[index:index + 2]
+
+    # --resume：从检查点继续
+    if '--resume' in sys.argv:
+        sys.argv.remove('--resume')
+        CONFIG['RESUME'] = True
+
+    # --months <范围> [--also-quarters]：批量统计多个月份范围
+    month_span = None
+    also_quarters = '--also-quarters' in sys.argv
+    if also_quarters:
+        sys.argv.remove('--also-quarters')
+    if '--months' in sys.argv:
+        index = sys.argv.index('--months')
+        if index + 1 >= len(sys.argv):
+            print("❌ --months 需要指定月份范围，例如 2025-01..2025-12")
+            sys.exit(1)
+        month_span = sys.argv[index + 1]
+        del sys.argv[index:index + 2]
+        if '--plan' in sys.argv or '--recompute' in sys.argv:
+            print("❌ --plan 和 --recompute 暂不支持 --months，请按单个月份范围执行")
+            sys.exit(1)
+
+    # --plan：只预估开销
+    run = main
+    if '--plan' in sys.argv:
+        sys.argv.remove('--plan')
+        run = plan
+
+    # --recompute：用本地缓存离线重算
+    if '--recompute' in sys.argv:
+        sys.argv.remove('--recompute')
+        run = recompute
+
     try:
-        if sys.argv[1] == '--last':
+        if month_span:
+            # 一次遍历统计多个月份范围
+            try:
+                period_list = expand_periods(parse_month_span(month_span), also_quarters)
+            except ValueError as e:
+                print(f"❌ 月份范围格式错误: {e}")
+                sys.exit(1)
+            run_periods(period_list)
+        elif run is recompute and len(sys.argv) == 1:
+            # 离线重算所有已有的数据文件
+            recompute_all()
+        elif sys.argv[1] == '--last':
             # 统计上个月
             year, month = get_previous_month()
             print(f"📅 自动选择上个月: {year}年{month}月")
-            main(year, month, month)
+            run(year, month, month)
         elif sys.argv[1] == '--current':
             # 统计当前月
             year, month = get_current_month()
             print(f"📅 自动选择当前月: {year}年{month}月")
-            main(year, month, month)
+            run(year, month, month)
         elif len(sys.argv) >= 4:
             # 指定年份和月份范围
             year = int(sys.argv[1])
@@ -800,7 +1770,7 @@ if __name__ == '__main__':
                 print("❌ 开始月份不能大于结束月份")
                 sys.exit(1)
 
-            main(year, start_month, end_month)
+            run(year, start_month, end_month)
         else:
             print("❌ 参数不足，请使用 --last 或指定年份和月份范围")
             sys.exit(1)
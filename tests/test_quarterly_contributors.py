@@ -0,0 +1,275 @@
+"""
+月份范围贡献者统计的离线回归测试
+
+用内存中的假组织替换 GitHub 客户端，验证：
+- --months 批量统计的输出与逐个月份范围单独统计的输出一致
+- --recompute 离线重算的输出与在线统计的输出一致（包括调整阈值后）
+- merge_stats 按仓库合并的结果与串行统计一致
+- serialize_stats / deserialize_stats 以及检查点的往返不丢信息
+
+运行：python -m unittest discover tests
+"""
+
+import contextlib
+import io
+import json
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'scripts'))
+sys.path.insert(0, str(ROOT / 'scripts' / 'quarterly_contributors'))
+
+import quarterly_contributors as q  # noqa: E402
+
+ORG = q.CONFIG['ORG_NAME']
+API = q.CONFIG['API_BASE']
+
+
+def make_commit(repo, index, login, committed, authored=None, additions=(12,), email=None):
+    """假组织中的一个commit：列表API和详情API共用的数据"""
+    return {
+        'repo': repo,
+        'sha': f"{repo}{index:04d}".ljust(40, '0'),
+        'login': login,
+        'email': email or f"{login or 'anon'}@example.com",
+        'committed': committed,
+        'authored': authored or committed,
+        'additions': list(additions),
+    }
+
+
+def build_org():
+    """
+    三个仓库、跨 2026 年 1-3 月的commit，覆盖：
+    同一作者跨仓库和跨月份、同一时间的多个commit（最近commit的排序）、
+    机器人账户、只能从 noreply 邮箱解析的作者、无效commit、作者时间与提交时间不同
+    """
+    commits = []
+    users = ['alice', 'bob', 'carol', 'dave']
+    for repo_index, repo in enumerate(['repo-a', 'repo-b', 'repo-c']):
+        for i in range(24):
+            month = i % 3 + 1
+            day = (i * 5 + repo_index * 3) % 27 + 1
+            committed = f"2026-{month:02d}-{day:02d}T{(i * 7) % 24:02d}:30:00Z"
+            authored = f"2026-{month:02d}-{day:02d}T08:00:00Z" if i % 5 == 0 else committed
+            login = users[(i + repo_index) % len(users)]
+            additions = (3, (i * 11 + repo_index * 5) % 40)
+            commits.append(make_commit(repo, i, login, committed, authored, additions))
+        commits.append(make_commit(repo, 100, 'dependabot[bot]', '2026-02-10T10:00:00Z', additions=(50,)))
+        commits.append(make_commit(repo, 101, None, '2026-03-03T12:00:00Z', additions=(30,),
+                                   email='123+erin@users.noreply.github.com'))
+    # 同一作者同一时间的多个commit，且是该作者最近的commit（超过 RECENT_COMMITS_LIMIT 个，需要按记录顺序取舍）
+    for i in range(4):
+        commits.append(make_commit('repo-b', 200 + i, 'alice', '2026-03-28T09:00:00Z', additions=(15 + i,)))
+    return commits
+
+
+class FakeClient:
+    """只实现 quarterly_contributors 用到的 GitHubClient 接口"""
+
+    def __init__(self, commits):
+        self.commits = commits
+        self.by_sha = {commit['sha']: commit for commit in commits}
+        # 组织仓库列表按更新时间排序，与仓库名顺序不同
+        self.repos = ['repo-c', 'repo-a', 'repo-b']
+        self.stats = {'requests': 0, 'cache_hits': 0, 'not_modified': 0, 'throttled': 0}
+        self.limiter = type('Limiter', (), {'limit': 1})()
+        self.tokens = type('Tokens', (), {'report': lambda self: None})()
+
+    def refresh_rate_limits(self):
+        return []
+
+    def paginate(self, url, params=None, strict=False):
+        self.stats['requests'] += 1
+        if url == f"{API}/orgs/{ORG}/repos":
+            return [[{'name': repo, 'fork': False} for repo in self.repos]]
+        repo = url.split('/')[-2]
+        since, until = params['since'], params['until']
+        page = [
+            {
+                'sha': commit['sha'],
+                'author': {'login': commit['login']} if commit['login'] else None,
+                'commit': {'committer': {'date': commit['committed']}},
+            }
+            for commit in self.commits
+            if commit['repo'] == repo and since <= commit['committed'] < until
+        ]
+        # 列表API按时间倒序返回
+        page.sort(key=lambda item: item['commit']['committer']['date'], reverse=True)
+        return [page]
+
+    def fetch_api(self, url):
+        self.stats['requests'] += 1
+        commit = self.by_sha[url.rsplit('/', 1)[1]]
+        return {
+            'commit': {
+                'author': {'name': commit['login'] or 'Erin', 'email': commit['email'], 'date': commit['authored']},
+                'message': f"update {commit['sha'][:10]}",
+            },
+            'author': {'login': commit['login']} if commit['login'] else None,
+            'files': [
+                {'filename': f"file{i}.md", 'additions': additions, 'deletions': 1, 'changes': additions + 1}
+                for i, additions in enumerate(commit['additions'])
+            ],
+        }
+
+    def map(self, func, items):
+        return [func(item) for item in items]
+
+
+def read_outputs(output_dir):
+    """读取输出目录中的所有数据文件，去掉每次都会变化的生成时间"""
+    outputs = {}
+    for path in sorted(Path(output_dir).glob('*.json')):
+        data = json.loads(path.read_text(encoding='utf-8'))
+        # 索引是记录列表，数据文件的生成时间在 meta 中
+        for item in data if isinstance(data, list) else [data['meta']]:
+            item.pop('generated_at', None)
+        outputs[path.name] = data
+    return outputs
+
+
+def normalize_heaps(stats):
+    return {
+        username: dict(data, recent_commits=sorted(data['recent_commits'], key=lambda entry: entry[:2]))
+        for username, data in stats.items()
+    }
+
+
+class QuarterlyContributorsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.saved_config = dict(q.CONFIG)
+        self.saved_get_client = q.get_client
+        self.client = FakeClient(build_org())
+        q.get_client = lambda: self.client
+        q.CONFIG.update({
+            'GITHUB_TOKENS': [],
+            'MIRROR_DIR': None,
+            'RESUME': False,
+            'VALID_COMMIT_THRESHOLD': 10,
+            'RECENT_COMMITS_LIMIT': 3,
+            'MAX_REPO_WORKERS': 1,
+        })
+
+    def tearDown(self):
+        q.get_client = self.saved_get_client
+        q.CONFIG.clear()
+        q.CONFIG.update(self.saved_config)
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def run_quietly(self, func, *args):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func(*args)
+
+    def use_dirs(self, name):
+        """每次统计使用独立的缓存和输出目录"""
+        q.CONFIG['CACHE_DIR'] = self.tmp / name / 'cache'
+        q.CONFIG['OUTPUT_DIR'] = self.tmp / name / 'output'
+        return q.CONFIG['OUTPUT_DIR']
+
+    def test_batch_months_match_separate_runs(self):
+        separate_dir = self.use_dirs('separate')
+        for period in [(2026, 1, 1), (2026, 2, 2), (2026, 3, 3), (2026, 1, 3)]:
+            self.run_quietly(q.main, *period)
+
+        batch_dir = self.use_dirs('batch')
+        q.CONFIG['MAX_REPO_WORKERS'] = 3
+        period_list = q.expand_periods(q.parse_month_span('2026-01..2026-03'), also_quarters=True)
+        self.assertEqual(period_list, [(2026, 1, 1), (2026, 2, 2), (2026, 3, 3), (2026, 1, 3)])
+        self.run_quietly(q.run_periods, period_list)
+
+        separate = read_outputs(separate_dir)
+        self.assertEqual(len(separate), 5)  # 4 个数据文件 + 索引
+        self.assertEqual(read_outputs(batch_dir), separate)
+
+        quarter = separate['monthly_contributors_2026_01_03.json']
+        usernames = {item['username'] for level in quarter['contributors'].values() for item in level}
+        self.assertIn('erin', usernames)
+        self.assertNotIn('dependabot[bot]', usernames)
+
+    def test_recompute_matches_online_run(self):
+        online_dir = self.use_dirs('online')
+        self.run_quietly(q.main, 2026, 1, 3)
+        online = read_outputs(online_dir)
+
+        # 用同一份缓存离线重算，结果写到另一个目录
+        q.CONFIG['OUTPUT_DIR'] = self.tmp / 'online' / 'recomputed'
+        requests_before = self.client.stats['requests']
+        self.run_quietly(q.recompute, 2026, 1, 3)
+        self.assertEqual(self.client.stats['requests'], requests_before)
+        self.assertEqual(read_outputs(q.CONFIG['OUTPUT_DIR']), online)
+
+        # 调整阈值后离线重算，与按新阈值重新在线统计的结果一致
+        q.CONFIG['VALID_COMMIT_THRESHOLD'] = 20
+        self.run_quietly(q.recompute, 2026, 1, 3)
+        recomputed = read_outputs(q.CONFIG['OUTPUT_DIR'])
+
+        fresh_dir = self.use_dirs('fresh')
+        self.run_quietly(q.main, 2026, 1, 3)
+        fresh = read_outputs(fresh_dir)
+        self.assertEqual(recomputed, fresh)
+        self.assertNotEqual(fresh, online)
+
+    def test_merge_stats_matches_serial_recording(self):
+        # 串行处理时按仓库顺序逐个统计
+        commits = sorted(build_org(), key=lambda commit: commit['repo'])
+        serial = {}
+        per_repo = {}
+        for commit in commits:
+            details = {
+                'sha': commit['sha'][:8],
+                'message': commit['sha'],
+                'date': commit['authored'],
+                'files': [{'additions': additions} for additions in commit['additions']],
+            }
+            login = commit['login'] or 'erin'
+            verified = commit['repo'] != 'repo-c'
+            q.add_commit_to_stats(serial, commit['repo'], details, login, verified)
+            q.add_commit_to_stats(per_repo.setdefault(commit['repo'], {}), commit['repo'], details, login, verified)
+
+        merged = {}
+        for repo in sorted(per_repo):
+            q.merge_stats(merged, per_repo[repo])
+
+        self.assertEqual(list(merged), list(serial))
+        self.assertEqual(q.classify_contributors(merged), q.classify_contributors(serial))
+        # 最近commit堆的内部排列与插入顺序有关，按堆元素排序后比较
+        self.assertEqual(normalize_heaps(merged), normalize_heaps(serial))
+
+    def test_serialize_stats_round_trip(self):
+        stats = {}
+        for commit in build_org():
+            details = {
+                'sha': commit['sha'][:8],
+                'message': commit['sha'],
+                'date': commit['authored'],
+                'files': [{'additions': additions} for additions in commit['additions']],
+            }
+            q.add_commit_to_stats(stats, commit['repo'], details, commit['login'] or 'erin', True)
+
+        restored = q.deserialize_stats(json.loads(json.dumps(q.serialize_stats(stats))))
+        self.assertEqual(restored, stats)
+
+        # 检查点经过 SQLite 往返后，合并结果与原始统计一致
+        cache_manager = q.CacheManager(self.tmp / 'checkpoint')
+        try:
+            cache_manager.save_checkpoint('run', 'repo-a', 7, {'2026_01_03': stats})
+            done = cache_manager.load_checkpoint('run')
+        finally:
+            cache_manager.close()
+        self.assertEqual(done['repo-a'][0], 7)
+        self.assertEqual(done['repo-a'][1]['2026_01_03'], stats)
+
+        merged = {}
+        q.merge_stats(merged, done['repo-a'][1]['2026_01_03'])
+        self.assertEqual(q.classify_contributors(merged), q.classify_contributors(stats))
+
+
+if __name__ == '__main__':
+    unittest.main()